@@ -4,11 +4,15 @@ import json
 import matplotlib.pyplot as plt
 import numpy as np
 from typing import List, Dict
-from assets.asset_factory import AssetFactory
+from assests.asset_factory import AssetFactory
 from data_fetcher.data_factory import DataFetcherFactory
+from optimizer.execution import OptimizerExecutor
 from optimizer.optimizer_factory import OptimizerFactory
 from portfolio.manager import PortfolioManager
+from portfolio.pipeline_job import PipelineJob
+from portfolio.price_alignment import PriceAligner
 from portfolio_analyzer.portfolio_analyzer import PortfolioAnalyzer
+from storage.results_store import ResultsStore
 
 # ----------------------------------------
 # PAGE CONFIG & STYLING
@@ -106,9 +110,18 @@ st.markdown("<hr>", unsafe_allow_html=True)
 st.sidebar.title("Optimization Settings")
 start_date = st.sidebar.date_input("Start Date", value=pd.to_datetime("2022-01-01"))
 end_date = st.sidebar.date_input("End Date", value=pd.to_datetime("2024-01-01"))
-optimizer_method = st.sidebar.selectbox("Optimizer Method", ["mean_variance", "covariance"])
+optimizer_method = st.sidebar.selectbox("Optimizer Method", ["mean_variance", "covariance", "hrp", "resampled", "sparse"])
+optimizer_options = {}
+if optimizer_method == "sparse":
+    optimizer_options = {
+        "max_holdings": st.sidebar.number_input("Max Holdings", min_value=2, max_value=200, value=20),
+        "min_weight": st.sidebar.slider("Min Position Size", 0.0, 0.10, 0.01, step=0.005),
+    }
+benchmark_symbol = st.sidebar.text_input("Benchmark (for betas)", value="SPY").strip().upper()
+alignment_policy = st.sidebar.selectbox("Date Alignment", ["intersection", "calendar", "resample"])
 risk_free_rate = st.sidebar.slider("Risk-Free Rate", 0.0, 0.10, 0.02, step=0.005)
 save_config = st.sidebar.checkbox("Save config.json after optimization", value=False)
+record_results = st.sidebar.checkbox("Record run in results.db", value=True)
 
 # ----------------------------------------
 # TABLE DATA
@@ -329,62 +342,146 @@ def plot_donut_3d(weights: Dict):
     plt.tight_layout()
     return fig
 
-if st.button("Run Optimization"):
-    if not st.session_state.get("asset_entries"):
-        st.error("No assets defined. Please add at least one asset.")
-    else:
-        specs: List[Dict] = st.session_state["asset_entries"]
-        manager = PortfolioManager(
+def inputs_key(specs: List[Dict]) -> str:
+    return json.dumps([specs, str(start_date), str(end_date), optimizer_method, optimizer_options,
+                       risk_free_rate, alignment_policy, benchmark_symbol], sort_keys=True, default=str)
+
+
+def start_job(specs: List[Dict]) -> PipelineJob:
+    def make_manager(on_iteration):
+        return PortfolioManager(
             asset_factory=AssetFactory,
             data_factory=DataFetcherFactory,
             optimizer_factory=OptimizerFactory,
-            analyzer=PortfolioAnalyzer(risk_free_rate=risk_free_rate)
+            analyzer=PortfolioAnalyzer(risk_free_rate=risk_free_rate),
+            aligner=PriceAligner(alignment_policy),
+            executor=OptimizerExecutor(OptimizerFactory, on_iteration=on_iteration),
         )
 
-        try:
-            with st.spinner("Fetching data..."):
-                collection = manager.build_collection_from_specs(specs)
-                price_df = manager.fetch_prices(collection, str(start_date), str(end_date))
-                st.success(f"Fetched price data successfully! (Shape: {price_df.shape})")
+    def record(job: PipelineJob):
+        result = job.result
+        result["run_id"] = ResultsStore("results.db").record_run(
+            job.specs, job.start_date, job.end_date, job.method, result["weights"],
+            result["expected_returns"], result["covariance"], metrics=result["analysis"],
+            timings=result["timings"], risk_free_rate=risk_free_rate,
+            solver=result["solver_attempts"][-1]["solver"],
+        )
 
-            expected_returns, covariance, _ = manager.compute_expected_returns_covariance(price_df)
-            weights = manager.optimize(expected_returns, covariance, method=optimizer_method)
-            weights = weights / weights.sum()
+    return PipelineJob(
+        make_manager, [dict(s) for s in specs], str(start_date), str(end_date),
+        method=optimizer_method, optimizer_options=optimizer_options,
+        benchmark=benchmark_symbol or None, key=inputs_key(specs),
+        on_finished=record if record_results else None,
+    ).start()
+
+
+def render_results(result: Dict):
+    report = result["alignment"]
+    st.success(f"Fetched price data successfully! (Shape: {result['price_df'].shape})")
+    st.caption(f"Alignment '{report['policy']}': {report['rows_out']} rows kept, "
+               f"{report['rows_dropped']} dropped, {sum(report['filled'].values())} cells forward-filled.")
+    solver_used = result["solver_attempts"][-1]
+    st.caption(f"Weights from solver '{solver_used['solver']}' in {solver_used['time']:.3f}s "
+               f"({len(result['solver_attempts'])} attempt(s)).")
+    if solver_used["status"] == "truncated":
+        st.warning(f"Solver '{solver_used['solver']}' {solver_used['message']}; weights are from a partial run.")
+
+    alloc = pd.DataFrame({
+        "weight": result["weights"],
+        "expected_return": result["expected_returns"]
+    })
+    alloc.insert(0, "type", result["holdings"]["type"])
+    alloc["contribution"] = alloc["weight"] * alloc["expected_return"]
+    attribution = result["attribution"]
+    risk = attribution["risk_contributions"]
+    alloc["risk_contribution"] = risk["pct_risk_contribution"]
+    if "beta" in risk:
+        alloc["beta"] = risk["beta"]
+
+    st.markdown("### Portfolio Allocation")
+    st.dataframe(
+        alloc.style.format({"weight": "{:.4f}", "expected_return": "{:.4%}", "contribution": "{:.4%}",
+                            "risk_contribution": "{:.2%}", "beta": "{:.2f}"}),
+        use_container_width=True
+    )
+    caption = f"Diversification ratio: {attribution['diversification_ratio']:.2f}"
+    if "portfolio_beta" in attribution:
+        caption += f" | Portfolio beta vs {benchmark_symbol}: {attribution['portfolio_beta']:.2f}"
+    st.caption(caption)
+
+    # Centered donut chart
+    fig = plot_donut_3d(dict(zip(alloc.index, alloc["weight"])))
+    left_space, center_col, right_space = st.columns([1, 2, 1])
+    with center_col:
+        st.pyplot(fig, use_container_width=False)
+
+    if "run_id" in result:
+        st.caption(f"Recorded as run #{result['run_id']} in results.db.")
+
+    # Compact summary boxes
+    analysis = result["analysis"]
+    st.markdown("### Portfolio Summary")
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        st.markdown(f"<div class='metric-card'><div class='metric-title'>Expected Return</div><div class='metric-value'>{analysis.get('expected_return', 0):.2%}</div></div>", unsafe_allow_html=True)
+    with c2:
+        st.markdown(f"<div class='metric-card'><div class='metric-title'>Volatility</div><div class='metric-value'>{analysis.get('volatility', 0):.2%}</div></div>", unsafe_allow_html=True)
+    with c3:
+        st.markdown(f"<div class='metric-card'><div class='metric-title'>Sharpe Ratio</div><div class='metric-value'>{analysis.get('sharpe_ratio', 0):.2f}</div></div>", unsafe_allow_html=True)
+
+    stress = result["stress"].sort_values("pnl")
+    st.markdown("### Stress Test (worst scenarios)")
+    st.dataframe(stress.head(10).style.format({"pnl": "{:.2%}", "volatility": "{:.2%}"}),
+                 use_container_width=True)
+    st.caption(f"{len(stress)} scenarios: rolling 21-day historical windows and correlation spikes.")
+
+    if not attribution["average_correlation"].empty:
+        st.markdown("### Average Pairwise Correlation (63-day rolling)")
+        st.line_chart(attribution["average_correlation"])
+
+    csv = alloc.to_csv(index=True)
+    st.download_button("Download Allocation CSV", data=csv, file_name="allocation.csv")
+
+
+@st.fragment(run_every=0.5)
+def job_progress():
+    job: PipelineJob = st.session_state.get("job")
+    if job is None:
+        return
+    if not job.running:
+        st.rerun()
+    for stage in PipelineJob.STAGES:
+        st.progress(job.progress[stage], text=stage.capitalize())
+    events = job.events
+    if events:
+        st.caption(events[-1]["message"])
+    if st.button("Cancel"):
+        job.cancel()
+
+
+specs: List[Dict] = st.session_state.get("asset_entries", [])
+job = st.session_state.get("job")
+
+# Inputs changed under a running job: its result would be stale, so stop it
+if job is not None and job.running and job.key != inputs_key(specs):
+    job.cancel()
+    st.info("Inputs changed; cancelled the running optimization.")
 
-            alloc = pd.DataFrame({
-                "weight": weights,
-                "expected_return": expected_returns
-            })
-            alloc["contribution"] = alloc["weight"] * alloc["expected_return"]
-
-            st.markdown("### Portfolio Allocation")
-            st.dataframe(
-                alloc.style.format({"weight": "{:.4f}", "expected_return": "{:.4%}", "contribution": "{:.4%}"}),
-                use_container_width=True
-            )
-
-            # Centered donut chart
-            fig = plot_donut_3d(dict(zip(alloc.index, alloc["weight"])))
-            left_space, center_col, right_space = st.columns([1, 2, 1])
-            with center_col:
-                st.pyplot(fig, use_container_width=False)
-
-            with st.spinner("Analyzing portfolio..."):
-                analysis = manager.analyze_portfolio(price_df, weights)
-
-            # Compact summary boxes
-            st.markdown("### Portfolio Summary")
-            c1, c2, c3 = st.columns(3)
-            with c1:
-                st.markdown(f"<div class='metric-card'><div class='metric-title'>Expected Return</div><div class='metric-value'>{analysis.get('expected_return', 0):.2%}</div></div>", unsafe_allow_html=True)
-            with c2:
-                st.markdown(f"<div class='metric-card'><div class='metric-title'>Volatility</div><div class='metric-value'>{analysis.get('volatility', 0):.2%}</div></div>", unsafe_allow_html=True)
-            with c3:
-                st.markdown(f"<div class='metric-card'><div class='metric-title'>Sharpe Ratio</div><div class='metric-value'>{analysis.get('sharpe_ratio', 0):.2f}</div></div>", unsafe_allow_html=True)
-
-            csv = alloc.to_csv(index=True)
-            st.download_button("Download Allocation CSV", data=csv, file_name="allocation.csv")
-
-        except Exception as exc:
-            st.error(f"Pipeline failed: {exc}")
-            st.exception(exc)
+if st.button("Run Optimization"):
+    if not specs:
+        st.error("No assets defined. Please add at least one asset.")
+    else:
+        if job is not None and job.running:
+            job.cancel()
+        job = st.session_state["job"] = start_job(specs)
+
+if job is not None:
+    if job.running:
+        job_progress()
+    elif job.status == "done":
+        render_results(job.result)
+    elif job.status == "cancelled":
+        st.warning("Optimization cancelled.")
+    elif job.status == "failed":
+        st.error(f"Pipeline failed: {job.error}")
+        st.exception(job.error)
@@ -1,26 +1,111 @@
 # assets/asset_collection.py
 
-from typing import List
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+import numpy as np
 from .asset_interface import AssetInterface
 
 class AssetCollection:
     """
-    Simple collection to hold AssetInterface objects.
+    Registry of AssetInterface objects.
+
+    Keeps a symbol -> position index plus type and sector groupings, so
+    lookups, sub-universe selection and weight mapping are O(1) per symbol.
+    Symbol lists and descriptions are built once and reused until the
+    collection changes.
     """
-    def __init__(self):
+    def __init__(self, assets: Optional[Iterable[AssetInterface]] = None):
         self.assets: List[AssetInterface] = []
+        self._index: Dict[str, int] = {}
+        self._by_type: Dict[str, List[int]] = defaultdict(list)
+        self._by_sector: Dict[Optional[str], List[int]] = defaultdict(list)
+        self._symbols: Optional[List[str]] = None
+        self._described: Optional[List[dict]] = None
+        for asset in assets or ():
+            self.add_asset(asset)
 
     def add_asset(self, asset: AssetInterface):
+        symbol = asset.get_symbol()
+        if symbol in self._index:
+            print(f"WARNING: duplicate symbol {symbol} ignored.")
+            return
+        pos = len(self.assets)
         self.assets.append(asset)
+        self._index[symbol] = pos
+        self._by_type[asset.get_type()].append(pos)
+        self._by_sector[asset.get_metadata().get("sector")].append(pos)
+        self._symbols = None
+        self._described = None
+
+    def __len__(self) -> int:
+        return len(self.assets)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._index
 
     def get_assets(self) -> List[AssetInterface]:
         return list(self.assets)
 
     def get_symbols(self) -> List[str]:
-        return [a.get_symbol() for a in self.assets]
+        if self._symbols is None:
+            self._symbols = [a.get_symbol() for a in self.assets]
+        return list(self._symbols)
+
+    def get(self, symbol: str) -> AssetInterface:
+        return self.assets[self._index[symbol]]
+
+    def index_of(self, symbol: str) -> int:
+        return self._index[symbol]
+
+    def by_type(self, asset_type: str) -> List[AssetInterface]:
+        return [self.assets[i] for i in self._by_type.get(asset_type.lower(), ())]
+
+    def by_sector(self, sector: Optional[str]) -> List[AssetInterface]:
+        return [self.assets[i] for i in self._by_sector.get(sector, ())]
+
+    def types(self) -> List[str]:
+        return list(self._by_type)
+
+    def sectors(self) -> List[Optional[str]]:
+        return list(self._by_sector)
+
+    def select(self, symbols: Iterable[str]) -> "AssetCollection":
+        """Sub-universe in the given symbol order. Unknown symbols raise KeyError."""
+        return AssetCollection(self.assets[self._index[s]] for s in symbols)
+
+    def map_weights(self, weights) -> List[tuple]:
+        """
+        weights: mapping/Series symbol -> weight
+        returns: [(asset, weight), ...] for the symbols present in the collection
+        """
+        return [(self.assets[self._index[s]], w) for s, w in weights.items() if s in self._index]
+
+    def _rows(self) -> List[dict]:
+        """Cached {symbol, type, **metadata} rows; internal callers must not mutate them."""
+        if self._described is None:
+            self._described = [
+                {"symbol": a.get_symbol(), "type": a.get_type(), **a.get_metadata()}
+                for a in self.assets
+            ]
+        return self._described
 
     def describe(self) -> List[dict]:
-        return [
-            {"symbol": a.get_symbol(), "type": a.get_type(), **a.get_metadata()}
-            for a in self.assets
-        ]
+        """One plain dict per asset: symbol, type and metadata. Callers may mutate or serialize them."""
+        return [dict(row) for row in self._rows()]
+
+    def to_numpy(self) -> Dict[str, np.ndarray]:
+        """
+        Columnar export: one array per field (symbol, type, then every metadata key).
+        Fields an asset type does not have are None.
+        """
+        rows = self._rows()
+        fields = list(dict.fromkeys(k for row in rows for k in row))
+        return {f: np.array([row.get(f) for row in rows], dtype=object) for f in fields}
+
+    def to_arrow(self):
+        """Columnar export as a pyarrow.Table (requires pyarrow)."""
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("to_arrow() requires pyarrow: pip install pyarrow") from e
+        return pa.table({f: col.tolist() for f, col in self.to_numpy().items()})
@@ -5,6 +5,8 @@ from .crypto import Crypto
 from .bond import Bond
 from .etf import ETF
 
+ASSET_TYPES = ("stock", "crypto", "bond", "etf")
+
 class AssetFactory:
     """
     Factory for creating Asset objects.
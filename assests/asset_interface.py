@@ -6,7 +6,9 @@ from typing import Dict
 class AssetInterface(ABC):
     """
     Interface for all asset classes.
+    Concrete assets declare __slots__ so large universes stay compact.
     """
+    __slots__ = ()
 
     @abstractmethod
     def get_symbol(self) -> str:
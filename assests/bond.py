@@ -4,7 +4,14 @@ from typing import Dict
 from .asset_interface import AssetInterface
 
 class Bond(AssetInterface):
+    __slots__ = ("name", "symbol", "coupon_rate", "maturity_years")
+
     def __init__(self, name: str, symbol: str, coupon_rate: float | None = None, maturity_years: int | None = None):
+        """
+        coupon_rate: annual coupon in percent, like FRED yields (4.5 means 4.5%);
+                     None prices the bond at par (coupon = yield)
+        maturity_years: tenor in years; None infers it from the FRED id (DGS10 -> 10)
+        """
         self.name = name
         self.symbol = symbol
         self.coupon_rate = coupon_rate
@@ -4,6 +4,8 @@ from typing import Dict
 from .asset_interface import AssetInterface
 
 class Crypto(AssetInterface):
+    __slots__ = ("name", "symbol", "exchange")
+
     def __init__(self, name: str, symbol: str, exchange: str = "Binance"):
         self.name = name
         self.symbol = symbol
@@ -4,6 +4,8 @@ from typing import Dict
 from .asset_interface import AssetInterface
 
 class ETF(AssetInterface):
+    __slots__ = ("name", "symbol", "category")
+
     def __init__(self, name: str, symbol: str, category: str | None = None):
         self.name = name
         self.symbol = symbol
@@ -4,6 +4,8 @@ from typing import Dict
 from .asset_interface import AssetInterface
 
 class Stock(AssetInterface):
+    __slots__ = ("name", "symbol", "sector")
+
     def __init__(self, name: str, symbol: str, sector: str | None = None):
         self.name = name
         self.symbol = symbol
@@ -0,0 +1,143 @@
+"""
+Bond data stage: turns FRED yield levels into approximate total-return indices.
+
+FRED bond series (DGS10, DGS2, ...) are yields in percent, not prices, so
+running pct_change on them is meaningless. Each day every bond is repriced
+as a semi-annual coupon bond at the new yield, vectorized across all bonds:
+
+    r_t = P(y_t; c, M) / P(y_{t-1}; c, M) - 1 + y_{t-1} / 252
+
+The first term is the price move from the yield change; the second is the
+carry (coupon plus pull-to-par), which for a bond held at an unchanged
+yield is the yield itself whatever the coupon, so a flat 4% yield returns
+about 4% a year. The coupon c (Bond.coupon_rate, in percent like the FRED
+yields; defaults to the previous day's yield, i.e. a par bond) and maturity
+M (Bond.maturity_years, defaulting to the tenor of a FRED constant-maturity
+Treasury id such as DGS10 or DTB3) set the price sensitivity. The result is
+a total-return index starting at 100, which the rest of the pipeline can
+treat like any other price series.
+"""
+
+import re
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+DEFAULT_MATURITY_YEARS = 10.0
+# Treasury yield ids: DGS10 / GS10 / DFII10 (years, DGS3MO in months),
+# DTB3 / TB3MS (bills, months; DTB4WK in weeks, DTB1YR in years)
+_NOTE_TENOR = re.compile(r"^(?:DGS|GS|DFII|FII)(\d+)(MO)?$", re.IGNORECASE)
+_BILL_TENOR = re.compile(r"^(?:DTB|TB)(\d+)(WK|YR)?(?:MS)?$", re.IGNORECASE)
+
+
+def infer_maturity_years(symbol: str) -> float:
+    """
+    Tenor of a FRED Treasury yield id: DGS10 -> 10, DGS3MO -> 0.25, DTB3 -> 0.25.
+    Other ids fall back to DEFAULT_MATURITY_YEARS with a warning; pass
+    Bond.maturity_years explicitly for them.
+    """
+    symbol = symbol.strip()
+    m = _NOTE_TENOR.match(symbol)
+    if m:
+        value = float(m.group(1))
+        return value / 12.0 if m.group(2) else value
+    m = _BILL_TENOR.match(symbol)
+    if m:
+        value = float(m.group(1))
+        unit = (m.group(2) or "").upper()
+        return value / 52.0 if unit == "WK" else value if unit == "YR" else value / 12.0
+    print(f"WARNING: {symbol} is not a known Treasury yield id; "
+          f"pricing it as a {DEFAULT_MATURITY_YEARS:g}-year bond")
+    return DEFAULT_MATURITY_YEARS
+
+
+def _as_decimal(rate) -> float:
+    """Coupon in percent (4.5 = 4.5%), the FRED convention, as a decimal."""
+    if rate is None or (isinstance(rate, float) and np.isnan(rate)):
+        return np.nan
+    return float(rate) / 100.0
+
+
+def bond_prices(yields: np.ndarray, coupons: np.ndarray, maturities: np.ndarray) -> np.ndarray:
+    """
+    Price per unit face of semi-annual coupon bonds, broadcast over (T, K).
+    yields/coupons are decimals, maturities in years.
+    """
+    half_y = yields / 2.0
+    periods = np.maximum(np.round(2.0 * maturities), 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        discount = (1.0 + half_y) ** (-periods)
+        annuity = np.where(np.abs(half_y) > 1e-12, (1.0 - discount) / half_y, periods)
+    return coupons / 2.0 * annuity + discount
+
+
+def yields_to_total_return_index(yields: pd.DataFrame, coupon_rates: Optional[List] = None,
+                                 maturity_years: Optional[List] = None, base: float = 100.0) -> pd.DataFrame:
+    """
+    yields: T x K frame of FRED yields in percent (one column per bond)
+    coupon_rates: per-column coupons in percent; maturity_years: per-column tenors;
+                  None entries use the defaults above
+    returns: T x K total-return indices starting at `base`
+    """
+    k = yields.shape[1]
+    coupon_rates = coupon_rates if coupon_rates is not None else [None] * k
+    maturity_years = maturity_years if maturity_years is not None else [None] * k
+
+    y = yields.ffill().values / 100.0
+    maturities = np.array([m if m is not None else infer_maturity_years(str(c))
+                           for m, c in zip(maturity_years, yields.columns)], dtype=float)
+    fixed = np.array([_as_decimal(c) for c in coupon_rates], dtype=float)
+
+    y_prev, y_now = y[:-1], y[1:]
+    # Par bond when no coupon is given: coupon equals yesterday's yield
+    coupons = np.where(np.isnan(fixed), y_prev, fixed)
+    price_prev = bond_prices(y_prev, coupons, maturities)
+    price_now = bond_prices(y_now, coupons, maturities)
+    returns = price_now / price_prev - 1.0 + y_prev / TRADING_DAYS
+
+    returns = np.vstack([np.zeros((1, k)), np.nan_to_num(returns, nan=0.0)])
+    index = base * np.cumprod(1.0 + returns, axis=0)
+    # Keep leading gaps (before a bond's first print) as missing
+    index[np.isnan(y)] = np.nan
+    return pd.DataFrame(index, index=yields.index, columns=yields.columns)
+
+
+class BondDataStage:
+    """
+    Fetches all bond yields in one go and converts them to total-return indices.
+    """
+
+    def fetch(self, bonds: List, fetcher, start_date: str, end_date: str) -> List[pd.Series]:
+        """
+        bonds: Bond assets (coupon_rate / maturity_years are read from them)
+        fetcher: bond fetcher; fetch_many(...) is used when available, fetch_data(...) otherwise
+        returns: one total-return index series per bond that could be fetched
+        """
+        symbols = [b.get_symbol().strip() for b in bonds]
+        if hasattr(fetcher, "fetch_many"):
+            yields = fetcher.fetch_many(symbols, start_date, end_date)
+        else:
+            series = []
+            for symbol in symbols:
+                try:
+                    series.append(fetcher.fetch_data(symbol, start_date, end_date))
+                except Exception as e:
+                    print(f"WARNING: failed to fetch {symbol}: {e}")
+            yields = pd.concat(series, axis=1) if series else pd.DataFrame()
+
+        available = [(b, s) for b, s in zip(bonds, symbols) if s in yields.columns]
+        for s in symbols:
+            if s not in yields.columns:
+                print(f"WARNING: no FRED data for {s}")
+        if not available:
+            return []
+
+        yields = yields[[s for _, s in available]].sort_index()
+        tr = yields_to_total_return_index(
+            yields,
+            coupon_rates=[getattr(b, "coupon_rate", None) for b, _ in available],
+            maturity_years=[getattr(b, "maturity_years", None) for b, _ in available],
+        )
+        return [tr[c].dropna() for c in tr.columns]
@@ -1,10 +1,76 @@
+import os
+from typing import List
+import pandas as pd
 from .data_fetcher_interface import DataFetcherInterface
-from pandas_datareader import data as pdr
+
+FRED_CSV_URL = "https://fred.stlouisfed.org/graph/fredgraph.csv"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "portfolio_optimizer", "fred")
+# FRED series skip weekends/holidays, so a cache is "complete" within this slack
+COVERAGE_SLACK = pd.Timedelta(days=7)
 
 class FredFetcher(DataFetcherInterface):
+    """
+    Fetches FRED series through the fredgraph CSV endpoint, which returns any
+    number of series in a single request, and keeps a local CSV cache per series.
+    """
+    def __init__(self, cache_dir: str | None = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+
     def fetch_data(self, symbol: str, start_date: str, end_date: str):
-        df = pdr.DataReader(symbol, 'fred', start_date, end_date)
-        if df.empty:
+        df = self.fetch_many([symbol], start_date, end_date)
+        if symbol not in df.columns or df[symbol].dropna().empty:
             raise ValueError(f"No FRED data for {symbol}")
-        return df.iloc[:, 0].dropna().rename(symbol)
+        return df[symbol].dropna().rename(symbol)
+
+    def fetch_many(self, symbols: List[str], start_date: str, end_date: str) -> pd.DataFrame:
+        """Fetch several FRED series; cached series are served locally, the rest in one request."""
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        frames, missing = [], []
+        for symbol in dict.fromkeys(symbols):
+            cached = self._read_cache(symbol)
+            if cached is not None and self._covers(cached, start, end):
+                frames.append(cached)
+            else:
+                missing.append(symbol)
+
+        if missing:
+            fetched = self._download(missing, start, end)
+            for symbol in fetched.columns:
+                series = fetched[symbol].dropna()
+                cached = self._read_cache(symbol)
+                if cached is not None:
+                    series = series.combine_first(cached)
+                self._write_cache(series)
+                frames.append(series)
+
+        if not frames:
+            raise ValueError(f"No FRED data for {', '.join(symbols)}")
+        return pd.concat(frames, axis=1).sort_index().loc[start:end]
+
+    def _download(self, symbols: List[str], start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        params = f"id={','.join(symbols)}&cosd={start:%Y-%m-%d}&coed={end:%Y-%m-%d}"
+        df = pd.read_csv(f"{FRED_CSV_URL}?{params}", index_col=0, parse_dates=True, na_values=".")
+        df.index.name = "DATE"
+        return df.apply(pd.to_numeric, errors="coerce")
+
+    @staticmethod
+    def _covers(series: pd.Series, start: pd.Timestamp, end: pd.Timestamp) -> bool:
+        if series.empty:
+            return False
+        end = min(end, pd.Timestamp.today().normalize())
+        return series.index[0] <= start + COVERAGE_SLACK and series.index[-1] >= end - COVERAGE_SLACK
+
+    def _cache_path(self, symbol: str) -> str:
+        return os.path.join(self.cache_dir, f"{symbol}.csv")
+
+    def _read_cache(self, symbol: str):
+        if not self.cache_dir or not os.path.exists(self._cache_path(symbol)):
+            return None
+        df = pd.read_csv(self._cache_path(symbol), index_col=0, parse_dates=True)
+        return df.iloc[:, 0].rename(symbol)
 
+    def _write_cache(self, series: pd.Series):
+        if not self.cache_dir:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        series.to_frame().to_csv(self._cache_path(series.name))
@@ -0,0 +1,40 @@
+import os
+import pandas as pd
+from .data_fetcher_interface import DataFetcherInterface
+
+class ReplayFetcher(DataFetcherInterface):
+    """
+    Serves previously recorded prices from local CSV files (<data_dir>/<SYMBOL>.csv,
+    first column a date index, second column the price). No network access.
+    """
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+
+    def fetch_data(self, symbol: str, start_date: str, end_date: str) -> pd.Series:
+        path = os.path.join(self.data_dir, f"{symbol}.csv")
+        if not os.path.exists(path):
+            raise ValueError(f"No replay data for {symbol} in {self.data_dir}")
+        df = pd.read_csv(path, index_col=0, parse_dates=True)
+        s = df.iloc[:, 0].sort_index().loc[start_date:end_date].dropna()
+        if s.empty:
+            raise ValueError(f"No replay data for {symbol} between {start_date} and {end_date}")
+        return s.rename(symbol)
+
+    @staticmethod
+    def record(series: pd.Series, data_dir: str):
+        """Write a fetched series so it can be replayed later."""
+        os.makedirs(data_dir, exist_ok=True)
+        series.to_frame().to_csv(os.path.join(data_dir, f"{series.name}.csv"))
+
+
+class ReplayDataFactory:
+    """
+    Drop-in replacement for DataFetcherFactory that serves every asset type
+    from a local replay directory. Instances are small and picklable, so they
+    can be handed to worker processes.
+    """
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+
+    def get_fetcher_for_asset_type(self, asset_type: str):
+        return ReplayFetcher(self.data_dir)
@@ -0,0 +1,167 @@
+"""
+execution.py
+-------------
+Bounded-time execution layer around OptimizerInterface.
+
+Each solve runs through a ranked chain of optimizers. 'mean_variance' uses
+    SLSQP (fast, analytic gradients) → trust-constr → analytic min-variance
+most other methods use
+    <method> → analytic min-variance
+and methods whose optimizer provides fallback() (sparse) use
+    <method> → <method>.fallback()
+
+Mean-variance links get the executor's wall-clock and iteration budgets and
+abort from their solver callback. Resampled and sparse only get a budget the
+caller sets in optimizer_options; they stop at the deadline and return what
+they have, and such an attempt is accepted with status "truncated" rather
+than "ok". Single-pass optimizers (hrp, covariance) cannot be interrupted;
+one that overruns the executor budget is rejected as a timeout (except the
+closed-form last link).
+
+Attempts are recorded with solver, status, iterations, time, objective
+(annualized volatility) and constraint violation, so callers can see which
+solver actually produced the weights. An attempt is only accepted if its
+constraint violation is within tol; if no link is accepted the executor
+raises SolverChainFailed instead of returning weights that ignore the
+constraints.
+"""
+
+import inspect
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .mean_variance_optimizer import SolveBudgetExceeded
+
+
+class SolverChainFailed(RuntimeError):
+    """No link of the solver chain produced acceptable weights."""
+
+    def __init__(self, message: str, attempts: Optional[List[Dict]] = None):
+        super().__init__(message)
+        self.attempts = attempts or []
+
+
+def _accepts_target_return(optimizer) -> bool:
+    return "target_return" in inspect.signature(optimizer.optimize).parameters
+
+
+class OptimizerExecutor:
+    """
+    Runs a ranked chain of optimizers and keeps per-attempt telemetry.
+    """
+
+    def __init__(self, optimizer_factory, time_budget: float = 5.0, max_iter: int = 1000, tol: float = 1e-6,
+                 on_iteration=None):
+        """
+        optimizer_factory: class providing get(method, **options)
+        time_budget: wall-clock seconds per mean-variance attempt; also the overrun limit for
+                     optimizers without a time_budget of their own
+        max_iter: iteration budget per attempt
+        tol: maximum constraint violation for an attempt to be accepted
+        on_iteration: forwarded to iterative solvers, called as (solver, iteration)
+        """
+        self.optimizer_factory = optimizer_factory
+        self.time_budget = time_budget
+        self.max_iter = max_iter
+        self.tol = tol
+        self.on_iteration = on_iteration
+
+    def chain_for(self, method: str, optimizer_options: Optional[Dict] = None) -> List[Tuple[str, object]]:
+        """Ranked (name, optimizer) list tried for `method`."""
+        method = method.lower()
+        if method == "mean_variance":
+            chain = [
+                (solver, self.optimizer_factory.get(
+                    "mean_variance", solver=solver, max_iter=self.max_iter, time_budget=self.time_budget,
+                    on_iteration=self._iteration_hook(solver)))
+                for solver in ("slsqp", "trust-constr")
+            ]
+        else:
+            options = optimizer_options or {}
+            optimizer = self.optimizer_factory.get(method, **options)
+            chain = [(method, optimizer)]
+            # Methods with their own constraints (e.g. sparse cardinality) supply a fallback
+            # that keeps them; a dense analytic solve would silently drop them
+            if hasattr(optimizer, "fallback"):
+                chain.append((f"{method}_fallback", optimizer.fallback()))
+                return chain
+        if method != "min_variance":
+            chain.append(("analytic", self.optimizer_factory.get("min_variance")))
+        return chain
+
+    def _iteration_hook(self, solver: str):
+        if self.on_iteration is None:
+            return None
+        return lambda iteration: self.on_iteration(solver, iteration)
+
+    def run(self, expected_returns: pd.Series, covariance: pd.DataFrame, method: str = "mean_variance",
+            target_return: Optional[float] = None,
+            optimizer_options: Optional[Dict] = None) -> Tuple[pd.Series, List[Dict]]:
+        """
+        returns: (weights summing to 1, attempts)
+            attempts: one dict per solver tried with solver, status, message, iterations,
+                      time, objective, violation and accepted
+        raises: SolverChainFailed (with .attempts) if no link meets the constraints
+        """
+        attempts: List[Dict] = []
+        chain = self.chain_for(method, optimizer_options)
+
+        for rank, (name, optimizer) in enumerate(chain):
+            last = rank == len(chain) - 1
+            attempt = {"solver": name, "status": "ok", "message": "", "iterations": None,
+                       "time": 0.0, "objective": None, "violation": None, "accepted": False}
+            start = time.perf_counter()
+            weights = None
+            try:
+                if _accepts_target_return(optimizer):
+                    weights = optimizer.optimize(expected_returns, covariance, target_return)
+                else:
+                    weights = optimizer.optimize(expected_returns, covariance)
+            except SolveBudgetExceeded as e:
+                attempt["status"], attempt["message"] = "timeout", str(e)
+            except RuntimeError as e:
+                attempt["status"], attempt["message"] = "failed", str(e)
+            except (ValueError, np.linalg.LinAlgError) as e:
+                attempt["status"], attempt["message"] = "error", f"{type(e).__name__}: {e}"
+            attempt["time"] = time.perf_counter() - start
+            info = getattr(optimizer, "last_info", {})
+            attempt["iterations"] = info.get("iterations")
+            if info.get("truncated") and weights is not None:
+                attempt["status"] = "truncated"
+                attempt["message"] = (f"stopped at the {getattr(optimizer, 'time_budget', None)}s budget "
+                                      f"after {info.get('iterations')} iterations")
+
+            overran = attempt["time"] > self.time_budget and not hasattr(optimizer, "time_budget")
+            if weights is not None and overran and not last:
+                # Could not be interrupted; a late answer is a timeout all the same
+                attempt["status"] = "timeout"
+                attempt["message"] = f"{name} took {attempt['time']:.3f}s, budget {self.time_budget}s"
+            elif weights is not None:
+                w = weights.reindex(expected_returns.index).values.astype(float)
+                attempt["objective"] = float(np.sqrt(max(w @ covariance.values @ w, 0.0)))
+                attempt["violation"] = self._violation(w, expected_returns.values, target_return)
+                if not np.isfinite(w).all():
+                    attempt["status"] = "error"
+                    attempt["message"] = "non-finite weights"
+                elif attempt["violation"] > self.tol:
+                    attempt["status"] = "infeasible"
+                    attempt["message"] = f"constraint violation {attempt['violation']:.3g} > tol {self.tol:g}"
+                else:
+                    attempt["accepted"] = True
+
+            attempts.append(attempt)
+            if attempt["accepted"]:
+                return pd.Series(w / w.sum(), index=expected_returns.index), attempts
+
+        summary = "; ".join(f"{a['solver']}: {a['status']} {a['message']}".strip() for a in attempts)
+        raise SolverChainFailed(f"No solver met the constraints for '{method}' ({summary})", attempts)
+
+    @staticmethod
+    def _violation(w: np.ndarray, mu: np.ndarray, target_return: Optional[float]) -> float:
+        violation = abs(w.sum() - 1.0)
+        if target_return is not None:
+            violation = max(violation, abs(w @ mu - target_return))
+        return float(violation)
@@ -1,9 +1,29 @@
+import time
 import numpy as np
 import pandas as pd
 from scipy.optimize import minimize
 from .optimizer_interface import OptimizerInterface
 
+
+class SolveBudgetExceeded(RuntimeError):
+    """Raised from a solver callback when the wall-clock budget runs out."""
+
+
 class MeanVarianceOptimizer(OptimizerInterface):
+    def __init__(self, solver: str = "trust-constr", max_iter: int | None = None, time_budget: float | None = None,
+                 on_iteration=None):
+        """
+        solver: 'trust-constr' (default) or 'slsqp' (faster QP-style solve with analytic gradients)
+        max_iter: iteration budget passed to the solver
+        time_budget: wall-clock budget in seconds, enforced from the solver callback
+        on_iteration: called with the iteration count after each solver iteration; may raise to cancel
+        """
+        self.solver = solver.lower()
+        self.max_iter = max_iter
+        self.time_budget = time_budget
+        self.on_iteration = on_iteration
+        self.last_info: dict = {}
+
     def optimize(self, expected_returns: pd.Series, cov_matrix: pd.DataFrame, target_return: float | None = None):
         n = len(expected_returns)
         mu = expected_returns.values
@@ -12,6 +32,10 @@ class MeanVarianceOptimizer(OptimizerInterface):
         def port_vol(w):
             return np.sqrt(w.T @ Sigma @ w)
 
+        def port_vol_grad(w):
+            vol = port_vol(w)
+            return Sigma @ w / vol if vol > 0 else np.zeros(n)
+
         x0 = np.ones(n) / n
         # Bound weights between 1% and 60% for diversification
         bounds = tuple((0.0, 0.7) for _ in range(n))
@@ -23,7 +47,29 @@ class MeanVarianceOptimizer(OptimizerInterface):
                 {'type': 'eq', 'fun': lambda w: w @ mu - target_return}
             )
 
-        res = minimize(lambda w: port_vol(w), x0, method='trust-constr', bounds=bounds, constraints=cons)
+        start = time.perf_counter()
+        iterations = 0
+
+        def callback(*args):
+            nonlocal iterations
+            iterations += 1
+            if self.on_iteration is not None:
+                self.on_iteration(iterations)
+            if self.time_budget is not None and time.perf_counter() - start > self.time_budget:
+                raise SolveBudgetExceeded(f'{self.solver} exceeded {self.time_budget}s after {iterations} iterations')
+
+        options = {} if self.max_iter is None else {'maxiter': self.max_iter}
+        try:
+            if self.solver == "slsqp":
+                res = minimize(port_vol, x0, jac=port_vol_grad, method='SLSQP', bounds=bounds,
+                               constraints=cons, callback=callback, options=options)
+            else:
+                res = minimize(lambda w: port_vol(w), x0, method='trust-constr', bounds=bounds,
+                               constraints=cons, callback=callback, options=options)
+        finally:
+            self.last_info = {"solver": self.solver, "iterations": iterations}
+
+        self.last_info["iterations"] = int(getattr(res, "nit", iterations))
         if not res.success:
             raise RuntimeError('Optimization failed: ' + str(res.message))
 
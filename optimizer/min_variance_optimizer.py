@@ -0,0 +1,39 @@
+"""
+min_variance_optimizer.py
+--------------------------
+Closed-form long-only approximation of the global minimum-variance portfolio.
+
+Formula:
+    w ∝ max(Σ⁻¹1, 0)
+
+Σ⁻¹1 is obtained from a single linear solve (no explicit inverse). Negative
+weights are clipped and the rest renormalized; if nothing survives the clip
+the optimizer falls back to inverse-variance weights. It cannot fail, which
+makes it the last link of the solver chain in optimizer/execution.py.
+"""
+
+import numpy as np
+import pandas as pd
+from .optimizer_interface import OptimizerInterface
+
+
+class MinVarianceOptimizer(OptimizerInterface):
+    """
+    Analytical long-only minimum-variance optimizer.
+    """
+
+    def optimize(self, expected_returns: pd.Series, cov_matrix: pd.DataFrame) -> pd.Series:
+        Sigma = cov_matrix.values
+        ones = np.ones(len(Sigma))
+
+        try:
+            raw_weights = np.linalg.solve(Sigma, ones)
+        except np.linalg.LinAlgError:
+            raw_weights = np.linalg.lstsq(Sigma, ones, rcond=None)[0]
+
+        raw_weights = np.clip(raw_weights, 0.0, None)
+        if not np.isfinite(raw_weights).all() or raw_weights.sum() <= 0:
+            raw_weights = 1.0 / np.clip(np.diag(Sigma), 1e-12, None)
+
+        weights = raw_weights / np.sum(raw_weights)
+        return pd.Series(weights, index=expected_returns.index, name="weights")
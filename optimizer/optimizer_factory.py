@@ -11,6 +11,10 @@ Follows SOLID principles:
 
 from .mean_variance_optimizer import MeanVarianceOptimizer
 from .covariance_optimizer import CovarianceOptimizer
+from .hrp_optimizer import HRPOptimizer
+from .resampled_optimizer import ResampledMeanVarianceOptimizer
+from .min_variance_optimizer import MinVarianceOptimizer
+from .sparse_optimizer import SparseOptimizer
 
 
 class OptimizerFactory:
@@ -19,7 +23,7 @@ class OptimizerFactory:
     """
 
     @staticmethod
-    def get(method: str):
+    def get(method: str, **options):
         """
         Returns an optimizer instance based on the selected method.
 
@@ -29,6 +33,14 @@ class OptimizerFactory:
             The optimizer type. Options:
             - 'mean_variance'
             - 'covariance'
+            - 'hrp'
+            - 'resampled'
+            - 'min_variance'
+            - 'sparse'
+        **options
+            Constructor arguments forwarded to the optimizer
+            (e.g. daily_returns / n_resamples for 'resampled',
+            max_holdings / min_weight for 'sparse').
 
         Returns
         -------
@@ -37,8 +49,16 @@ class OptimizerFactory:
         """
         method = method.lower()
         if method == "mean_variance":
-            return MeanVarianceOptimizer()
+            return MeanVarianceOptimizer(**options)
         elif method == "covariance":
-            return CovarianceOptimizer()
+            return CovarianceOptimizer(**options)
+        elif method == "hrp":
+            return HRPOptimizer(**options)
+        elif method == "resampled":
+            return ResampledMeanVarianceOptimizer(**options)
+        elif method == "min_variance":
+            return MinVarianceOptimizer(**options)
+        elif method == "sparse":
+            return SparseOptimizer(**options)
         else:
             raise ValueError(f"Unknown optimizer method: {method}")
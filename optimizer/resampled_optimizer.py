@@ -0,0 +1,264 @@
+"""
+resampled_optimizer.py
+-----------------------
+Implements resampled-efficiency mean-variance optimization (Michaud).
+
+A single solve on noisy sample μ/Σ gives unstable weights. Instead:
+    1. Draw B resamples of the daily returns
+       - block bootstrap of the observed returns when they are available
+         (preserves short-range autocorrelation), otherwise
+       - parametric draws from N(μ, Σ)
+    2. Re-estimate μ/Σ for each resample with batched (vectorized) moments
+    3. Solve the same long-only problem as MeanVarianceOptimizer per
+       resample (minimum variance, 0 ≤ w ≤ max_weight, optionally at a target
+       return), warm-started from the previous solution
+    4. Average the weights
+
+Resamples are processed in chunks (memory is bounded by chunk_size × T × N)
+and chunks are spread over a process pool. The daily returns are sent to
+each worker once; a chunk task only carries its bootstrap row indices.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from .mean_variance_optimizer import SolveBudgetExceeded
+from .optimizer_interface import OptimizerInterface
+
+TRADING_DAYS = 252
+
+# Per-worker state, populated once by _init_worker
+_STATE: dict = {}
+
+
+def _init_worker(returns, mu_daily, chol, n_obs, params):
+    _STATE.update(returns=returns, mu_daily=mu_daily, chol=chol, n_obs=n_obs, params=params)
+
+
+def _init_shared_worker(handle, params):
+    """Pool initializer for the bootstrap path: map the published returns zero-copy."""
+    from portfolio.shared_risk_model import attach
+    _init_worker(attach(handle).arrays["daily_returns"], None, None, None, params)
+
+
+def _batched_moments(samples: np.ndarray, periods_per_year: int = TRADING_DAYS):
+    """samples: (B, T, N) -> annualized mu (B, N) and Sigma (B, N, N)."""
+    mu = samples.mean(axis=1)
+    centered = samples - mu[:, None, :]
+    cov = np.matmul(centered.transpose(0, 2, 1), centered) / (samples.shape[1] - 1)
+    cov *= periods_per_year
+    # Same ridge as PortfolioManager.compute_expected_returns_covariance
+    idx = np.arange(cov.shape[1])
+    cov[:, idx, idx] += 1e-6
+    return mu * periods_per_year, cov
+
+
+def _solve_one(mu: np.ndarray, Sigma: np.ndarray, x0: np.ndarray, params: dict):
+    """
+    Long-only solve with analytic gradients: min w'Sigma w (s.t. w'mu = target_return
+    if given), or max w'mu - lam/2 w'Sigma w when a risk_aversion lam is set.
+    """
+    n = len(mu)
+    bounds = [(0.0, params["max_weight"])] * n
+    cons = [{'type': 'eq', 'fun': lambda w: np.sum(w) - 1.0, 'jac': lambda w: np.ones(n)}]
+    target = params["target_return"]
+
+    lam = params["risk_aversion"]
+    if target is None and lam is not None:
+        def fun(w):
+            Sw = Sigma @ w
+            return -(w @ mu) + 0.5 * lam * (w @ Sw), -mu + lam * Sw
+    else:
+        if target is not None:
+            cons.append({'type': 'eq', 'fun': lambda w: w @ mu - target, 'jac': lambda w: mu})
+
+        def fun(w):
+            Sw = Sigma @ w
+            return w @ Sw, 2.0 * Sw
+
+    res = minimize(fun, x0, jac=True, method='SLSQP', bounds=bounds, constraints=cons,
+                   options={'maxiter': params["max_iter"], 'ftol': 1e-10})
+    return res.x, bool(res.success)
+
+
+def _solve_chunk(task):
+    """
+    task: ('bootstrap', row_indices (B, T)) or ('parametric', (seed, B))
+    returns: (weights (b, N), success mask (b,)), b < B if the deadline passed mid-chunk
+    """
+    kind, payload = task
+    params = _STATE["params"]
+    deadline = params["deadline"]
+    if deadline is not None and time.time() > deadline:
+        return np.empty((0, len(params["x0"]))), np.zeros(0, dtype=bool)
+    if kind == "bootstrap":
+        samples = _STATE["returns"][payload]
+    else:
+        seed, count = payload
+        rng = np.random.default_rng(seed)
+        n = len(_STATE["mu_daily"])
+        z = rng.standard_normal((count, _STATE["n_obs"], n))
+        samples = _STATE["mu_daily"] + z @ _STATE["chol"].T
+
+    mus, covs = _batched_moments(samples, params["periods_per_year"])
+    del samples
+
+    weights = np.empty_like(mus)
+    ok = np.zeros(len(mus), dtype=bool)
+    x0 = params["x0"]
+    for b in range(len(mus)):
+        if deadline is not None and time.time() > deadline:
+            return weights[:b], ok[:b]
+        w, success = _solve_one(mus[b], covs[b], x0, params)
+        weights[b], ok[b] = w, success
+        if success:
+            x0 = w  # warm start the next resample
+    return weights, ok
+
+
+def _drain(pool: ProcessPoolExecutor, tasks, collect):
+    """Submit all chunks and collect them as they finish; if collect raises
+    (e.g. a progress callback cancelling the run) pending chunks are dropped."""
+    futures = [pool.submit(_solve_chunk, t) for t in tasks]
+    try:
+        for future in as_completed(futures):
+            collect(future.result())
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+
+
+class ResampledMeanVarianceOptimizer(OptimizerInterface):
+    """
+    Resampled-efficiency optimizer: averages long-only mean-variance weights
+    over B bootstrap resamples of the return history.
+    """
+
+    def __init__(self, daily_returns: Optional[pd.DataFrame] = None, n_resamples: int = 500,
+                 block_size: int = 20, n_observations: Optional[int] = None, risk_aversion: Optional[float] = None,
+                 max_weight: float = 0.7, chunk_size: int = 50, max_workers: Optional[int] = None,
+                 max_iter: int = 200, seed: Optional[int] = None,
+                 progress: Optional[Callable[[int, int], None]] = None, time_budget: Optional[float] = None,
+                 periods_per_year: int = TRADING_DAYS):
+        """
+        daily_returns: returns from compute_expected_returns_covariance; without them the
+                       optimizer falls back to parametric draws of n_observations (one year
+                       by default) periods from N(μ, Σ)
+        block_size: length of the moving blocks used by the bootstrap
+        risk_aversion: λ in max w'μ - λ/2 w'Σw (ignored when a target_return is given); None
+                       minimizes variance like MeanVarianceOptimizer
+        chunk_size: resamples held in memory / sent to a worker at a time
+        progress: callback(done, total) invoked as chunks complete; may raise to cancel the run
+        time_budget: wall-clock seconds; resampling stops at the deadline and the weights are
+                     averaged over the resamples finished by then (last_info["truncated"])
+        periods_per_year: rows of daily_returns per year (52 for weekly prices)
+        """
+        self.daily_returns = daily_returns
+        self.n_resamples = n_resamples
+        self.block_size = block_size
+        self.periods_per_year = periods_per_year
+        self.n_observations = n_observations or periods_per_year
+        self.risk_aversion = risk_aversion
+        self.max_weight = max_weight
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_iter = max_iter
+        self.seed = seed
+        self.progress = progress
+        self.time_budget = time_budget
+        self.diagnostics: dict = {}
+        self.last_info: dict = {}
+
+    def optimize(self, expected_returns: pd.Series, cov_matrix: pd.DataFrame,
+                 target_return: float | None = None) -> pd.Series:
+        symbols = expected_returns.index
+        n = len(symbols)
+        mu = expected_returns.values.astype(float)
+        Sigma = cov_matrix.reindex(index=symbols, columns=symbols).values.astype(float)
+        rng = np.random.default_rng(self.seed)
+        # Absolute wall-clock deadline so worker processes can check it too
+        deadline = None if self.time_budget is None else time.time() + self.time_budget
+
+        params = {
+            "deadline": deadline,
+            "risk_aversion": self.risk_aversion,
+            "max_weight": max(self.max_weight, 1.0 / n),
+            "target_return": target_return,
+            "max_iter": self.max_iter,
+            "periods_per_year": self.periods_per_year,
+        }
+        # Full-sample solution: the starting point every chunk is warm-started from
+        params["x0"] = np.full(n, 1.0 / n)
+        params["x0"], _ = _solve_one(mu, Sigma, params["x0"], params)
+
+        sizes = [min(self.chunk_size, self.n_resamples - i) for i in range(0, self.n_resamples, self.chunk_size)]
+        if self.daily_returns is not None:
+            returns = np.ascontiguousarray(self.daily_returns[symbols].values, dtype=float)
+            init = (returns, None, None, None, params)
+            tasks = [("bootstrap", self._block_indices(rng, size, len(returns))) for size in sizes]
+        else:
+            chol = np.linalg.cholesky(Sigma / self.periods_per_year)
+            init = (None, mu / self.periods_per_year, chol, self.n_observations, params)
+            tasks = [("parametric", (int(rng.integers(2**63)), size)) for size in sizes]
+
+        total = sum(sizes)
+        done = 0
+        weights_sum = np.zeros(n)
+        weights_sq = np.zeros(n)
+        n_ok = 0
+
+        def collect(result):
+            nonlocal done, n_ok, weights_sum, weights_sq
+            w, ok = result
+            weights_sum += w[ok].sum(axis=0)
+            weights_sq += (w[ok] ** 2).sum(axis=0)
+            n_ok += int(ok.sum())
+            done += len(ok)
+            if self.progress is not None:
+                self.progress(done, total)
+
+        if self.max_workers <= 1 or len(tasks) <= 1:
+            _init_worker(*init)
+            for task in tasks:
+                if deadline is not None and time.time() > deadline:
+                    break
+                collect(_solve_chunk(task))
+        elif self.daily_returns is not None:
+            from portfolio.shared_risk_model import SharedRiskModel
+            # Publish the return matrix once instead of pickling it into every worker
+            with SharedRiskModel.publish(daily_returns=self.daily_returns[symbols]) as model:
+                with ProcessPoolExecutor(max_workers=min(self.max_workers, len(tasks)),
+                                         initializer=_init_shared_worker, initargs=(model.handle, params)) as pool:
+                    _drain(pool, tasks, collect)
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(tasks)),
+                                     initializer=_init_worker, initargs=init) as pool:
+                _drain(pool, tasks, collect)
+
+        self.last_info = {"iterations": n_ok, "truncated": done < total}
+        if n_ok == 0 and done < total:
+            raise SolveBudgetExceeded(f'resampled exceeded {self.time_budget}s before any resample converged')
+        if n_ok == 0:
+            raise RuntimeError('Resampled optimization failed: no resample converged')
+
+        mean = weights_sum / n_ok
+        self.diagnostics = {
+            "n_resamples": done,
+            "n_converged": n_ok,
+            "weight_std": pd.Series(np.sqrt(np.maximum(weights_sq / n_ok - mean ** 2, 0.0)), index=symbols),
+        }
+        return pd.Series(mean / mean.sum(), index=symbols, name="weights")
+
+    def _block_indices(self, rng: np.random.Generator, count: int, n_rows: int) -> np.ndarray:
+        """Moving-block bootstrap row indices, shape (count, n_rows)."""
+        block = max(1, min(self.block_size, n_rows))
+        n_blocks = -(-n_rows // block)
+        starts = rng.integers(0, n_rows - block + 1, size=(count, n_blocks))
+        idx = (starts[:, :, None] + np.arange(block)).reshape(count, -1)[:, :n_rows]
+        return idx.astype(np.int32)
@@ -0,0 +1,281 @@
+"""
+sparse_optimizer.py
+--------------------
+Cardinality-constrained long-only portfolio: at most `max_holdings` names,
+each held at `min_weight` or more.
+
+Two phases:
+    1. Screening by iterative hard thresholding on the full universe:
+           w ← P_K(w − η ∇f(w))
+       where P_K keeps the K largest entries and projects them onto the
+       capped simplex {0 ≤ w ≤ max_weight, Σw = 1}. Each step is a single
+       Σ·w product (O(N²)), with no factorization or dense QP over N assets.
+    2. A small SLSQP solve on the surviving active set, refined greedily:
+       names that end up below min_weight are dropped, and the inactive
+       name with the most negative reduced cost is added (or swapped in for
+       the smallest holding once K names are held) while that lowers the
+       objective. Each round costs one N×K product plus a K-asset QP.
+
+f is the portfolio variance (same minimizer as MeanVarianceOptimizer's
+volatility), or ½λ w'Σw − w'μ when risk_aversion is given. A target
+return is a penalty during screening and an equality constraint in phase 2;
+if the active set cannot reach it, the solve raises RuntimeError.
+
+The executor's fallback for this method is fallback(): the screened
+weights alone (phase 1 plus the min_weight drop), which never fail and keep
+the cardinality and size limits. A dense solver would ignore them.
+"""
+
+import time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from .optimizer_interface import OptimizerInterface
+
+
+def _project_capped_simplex(v: np.ndarray, cap: float, iters: int = 60, floor: float = 0.0) -> np.ndarray:
+    """Euclidean projection onto {floor ≤ w ≤ cap, Σw = 1} by bisection on the shift τ."""
+    lo, hi = v.min() - 1.0, v.max()
+    for _ in range(iters):
+        tau = 0.5 * (lo + hi)
+        if np.clip(v - tau, floor, cap).sum() > 1.0:
+            lo = tau
+        else:
+            hi = tau
+    return np.clip(v - 0.5 * (lo + hi), floor, cap)
+
+
+def _largest_eigenvalue(Sigma: np.ndarray, iters: int = 30) -> float:
+    x = np.ones(len(Sigma)) / np.sqrt(len(Sigma))
+    lam = 0.0
+    for _ in range(iters):
+        y = Sigma @ x
+        lam = float(np.linalg.norm(y))
+        if lam == 0.0:
+            break
+        x = y / lam
+    return lam
+
+
+class SparseOptimizer(OptimizerInterface):
+    """
+    Cardinality-constrained optimizer for large universes.
+    """
+
+    def __init__(self, max_holdings: int = 20, min_weight: float = 0.01, max_weight: float = 0.7,
+                 risk_aversion: Optional[float] = None, max_iter: int = 200, max_rounds: int = 50,
+                 tol: float = 1e-8, time_budget: Optional[float] = None):
+        """
+        max_holdings: cardinality limit K
+        min_weight: smallest non-zero position
+        max_weight: per-asset cap (same default as MeanVarianceOptimizer)
+        risk_aversion: λ for ½λ w'Σw − w'μ; None minimizes variance
+        max_iter: screening iterations
+        max_rounds: active-set drop/swap rounds
+        time_budget: wall-clock seconds; screening and refinement stop at the deadline and
+                     the current active set is solved as is (last_info["truncated"])
+        """
+        if max_weight * max_holdings < 1.0:
+            raise ValueError(f"max_holdings={max_holdings} x max_weight={max_weight} cannot sum to 1")
+        if not 0.0 <= min_weight <= max_weight:
+            raise ValueError(f"min_weight must be in [0, max_weight], got {min_weight}")
+        self.max_holdings = max_holdings
+        self.min_weight = min_weight
+        self.max_weight = max_weight
+        self.risk_aversion = risk_aversion
+        self.max_iter = max_iter
+        self.max_rounds = max_rounds
+        self.tol = tol
+        self.time_budget = time_budget
+        self.last_info: dict = {}
+
+    def fallback(self) -> "SparseScreenOptimizer":
+        """Closed-form last link for the solver chain that respects max_holdings / min_weight."""
+        return SparseScreenOptimizer(self)
+
+    def screened_weights(self, expected_returns: pd.Series, cov_matrix: pd.DataFrame,
+                         target_return: Optional[float] = None) -> pd.Series:
+        """Phase 1 only: at most max_holdings names, each in [min_weight, max_weight]."""
+        mu = expected_returns.values.astype(float)
+        Sigma = cov_matrix.values.astype(float)
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        w, iterations = self._screen(Sigma, mu, target_return, deadline)
+        min_names = int(np.ceil(1.0 / self.max_weight - 1e-12))
+
+        active = np.flatnonzero(w > 0)
+        x = w[active]
+        while (x < self.min_weight).any() and (x >= self.min_weight).sum() >= min_names:
+            keep = x >= self.min_weight
+            active = active[keep]
+            x = _project_capped_simplex(x[keep], self.max_weight)
+        if (x < self.min_weight).any():
+            x = _project_capped_simplex(x, self.max_weight, floor=self.min_weight)
+
+        weights = np.zeros(len(mu))
+        weights[active] = x
+        self.last_info = {"solver": "sparse_screen", "iterations": iterations, "holdings": int(len(active))}
+        return pd.Series(weights, index=expected_returns.index, name="weights")
+
+    def _past(self, deadline: Optional[float]) -> bool:
+        return deadline is not None and time.perf_counter() > deadline
+
+    def _screen(self, Sigma: np.ndarray, mu: np.ndarray, target_return: Optional[float],
+                deadline: Optional[float] = None):
+        n = len(mu)
+        k = min(self.max_holdings, n)
+        scale = 2.0 if self.risk_aversion is None else self.risk_aversion
+        lipschitz = scale * max(_largest_eigenvalue(Sigma), 1e-12)
+        # A target return enters screening as a quadratic penalty ρ(w'μ − target)²,
+        # weighted like the risk term so the chosen names can actually reach it
+        rho = 0.0 if target_return is None else lipschitz / max(mu @ mu, 1e-12)
+        step = 1.0 / (lipschitz + 2.0 * rho * (mu @ mu))
+
+        def gradient(w):
+            g = 2.0 * Sigma @ w if self.risk_aversion is None else self.risk_aversion * Sigma @ w - mu
+            if rho:
+                g += 2.0 * rho * (w @ mu - target_return) * mu
+            return g
+
+        # Start from inverse-variance weights on the K lowest-variance names
+        w = np.zeros(n)
+        start = np.argsort(np.diag(Sigma))[:k]
+        w[start] = _project_capped_simplex(1.0 / np.clip(np.diag(Sigma)[start], 1e-12, None), self.max_weight)
+
+        # Nesterov momentum (accelerated IHT); restarted whenever the support changes
+        y, t, it = w.copy(), 1.0, 0
+        for it in range(1, self.max_iter + 1):
+            if self._past(deadline):
+                break
+            v = y - step * gradient(y)
+            support = np.argpartition(v, n - k)[n - k:] if k < n else np.arange(n)
+            w_new = np.zeros(n)
+            w_new[support] = _project_capped_simplex(v[support], self.max_weight)
+            delta = w_new - w
+            if np.linalg.norm(delta) < self.tol:
+                w = w_new
+                break
+            if np.array_equal(w_new > 0, w > 0):
+                t_new = 0.5 * (1.0 + np.sqrt(1.0 + 4.0 * t * t))
+                y = w_new + ((t - 1.0) / t_new) * delta
+                t = t_new
+            else:
+                y, t = w_new, 1.0
+            w = w_new
+        return w, it
+
+    def _solve_active(self, Sigma: np.ndarray, mu: np.ndarray, x0: np.ndarray, lower: float,
+                      target_return: Optional[float]):
+        """Small QP on the active set. returns: (weights, objective)"""
+        n = len(mu)
+        cons = [{'type': 'eq', 'fun': lambda w: np.sum(w) - 1.0, 'jac': lambda w: np.ones(n)}]
+        if target_return is not None:
+            cons.append({'type': 'eq', 'fun': lambda w: w @ mu - target_return, 'jac': lambda w: mu})
+
+        if self.risk_aversion is None:
+            def fun(w):
+                Sw = Sigma @ w
+                return w @ Sw, 2.0 * Sw
+        else:
+            lam = self.risk_aversion
+
+            def fun(w):
+                Sw = Sigma @ w
+                return 0.5 * lam * (w @ Sw) - w @ mu, lam * Sw - mu
+
+        res = minimize(fun, x0, jac=True, method='SLSQP', bounds=[(lower, self.max_weight)] * n,
+                       constraints=cons)
+        if not res.success:
+            raise RuntimeError('Sparse active-set solve failed: ' + str(res.message))
+        return res.x, float(res.fun)
+
+    def _reduced_costs(self, Sigma: np.ndarray, mu: np.ndarray, active: np.ndarray, x: np.ndarray,
+                       target_return: Optional[float]) -> np.ndarray:
+        """
+        ∇f minus the equality-constraint multipliers fitted on the interior active names.
+        A negative entry for an inactive name means adding it lowers the objective.
+        """
+        Sx = Sigma[:, active] @ x
+        g = 2.0 * Sx if self.risk_aversion is None else self.risk_aversion * Sx - mu
+        A = np.ones((len(mu), 1)) if target_return is None else np.column_stack([np.ones(len(mu)), mu])
+        interior = active[(x > 1e-9) & (x < self.max_weight - 1e-9)]
+        if len(interior) == 0:
+            interior = active
+        multipliers = np.linalg.lstsq(A[interior], g[interior], rcond=None)[0]
+        return g - A @ multipliers
+
+    def optimize(self, expected_returns: pd.Series, cov_matrix: pd.DataFrame,
+                 target_return: Optional[float] = None) -> pd.Series:
+        mu = expected_returns.values.astype(float)
+        Sigma = cov_matrix.values.astype(float)
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        w, iterations = self._screen(Sigma, mu, target_return, deadline)
+        k = min(self.max_holdings, len(mu))
+        min_names = int(np.ceil(1.0 / self.max_weight - 1e-12))
+
+        def solve(names, x0, lower=0.0):
+            return self._solve_active(Sigma[np.ix_(names, names)], mu[names], x0 / x0.sum(), lower, target_return)
+
+        active = np.flatnonzero(w > 0)
+        x, obj = solve(active, w[active])
+        excluded = np.zeros(len(mu), dtype=bool)
+        rounds = 0
+        for rounds in range(1, self.max_rounds + 1):
+            # Names under min_weight leave for good (otherwise they would be swapped straight back in)
+            small = x < self.min_weight
+            if small.any() and (~small).sum() >= min_names:
+                excluded[active[small]] = True
+                active = active[~small]
+                x, obj = solve(active, x[~small])
+                continue
+
+            if self._past(deadline):
+                break
+            # Greedy refinement: bring in the name with the most negative reduced cost,
+            # swapping out the smallest holding when the book is full
+            reduced = self._reduced_costs(Sigma, mu, active, x, target_return)
+            reduced[active] = np.inf
+            reduced[excluded] = np.inf
+            best = int(np.argmin(reduced))
+            if not reduced[best] < -self.tol:
+                break
+            if len(active) < k:
+                trial, x0 = np.append(active, best), np.append(x, self.min_weight)
+            else:
+                out = int(np.argmin(x))
+                trial, x0 = active.copy(), x.copy()
+                trial[out], x0[out] = best, x[out]
+            try:
+                x_trial, obj_trial = solve(trial, x0)
+            except RuntimeError:
+                break
+            if obj_trial >= obj - 1e-12:
+                break
+            active, x, obj = trial, x_trial, obj_trial
+
+        # Any survivors still under the threshold are lifted to it
+        if (x < self.min_weight).any():
+            x, obj = solve(active, np.clip(x, self.min_weight, self.max_weight), self.min_weight)
+
+        weights = np.zeros(len(mu))
+        weights[active] = x
+        self.last_info = {"solver": "sparse", "iterations": iterations, "rounds": rounds,
+                          "holdings": int(len(active)), "truncated": self._past(deadline)}
+        return pd.Series(weights, index=expected_returns.index, name="weights")
+
+
+class SparseScreenOptimizer(OptimizerInterface):
+    """
+    Screening-only variant of a SparseOptimizer, used as its solver-chain fallback.
+    """
+
+    def __init__(self, sparse: SparseOptimizer):
+        self.sparse = sparse
+        self.last_info: dict = {}
+
+    def optimize(self, expected_returns: pd.Series, cov_matrix: pd.DataFrame,
+                 target_return: Optional[float] = None) -> pd.Series:
+        weights = self.sparse.screened_weights(expected_returns, cov_matrix, target_return)
+        self.last_info = self.sparse.last_info
+        return weights
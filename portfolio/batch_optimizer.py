@@ -0,0 +1,154 @@
+# portfolio/batch_optimizer.py
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from optimizer.execution import OptimizerExecutor
+from portfolio.shared_risk_model import SharedRiskModel, attach
+
+# Per-worker risk model, populated once by _init_worker (in-process) or
+# _init_shared_worker (pool) so that each task only carries the integer
+# positions of its sub-universe.
+_MU: Optional[np.ndarray] = None
+_SIGMA: Optional[np.ndarray] = None
+_SYMBOLS: Optional[pd.Index] = None
+_OPTIMIZER_FACTORY = None
+
+
+def _init_worker(mu: np.ndarray, sigma: np.ndarray, symbols: pd.Index, optimizer_factory):
+    global _MU, _SIGMA, _SYMBOLS, _OPTIMIZER_FACTORY
+    _MU = mu
+    _SIGMA = sigma
+    _SYMBOLS = symbols
+    _OPTIMIZER_FACTORY = optimizer_factory
+
+
+def _init_shared_worker(handle: Dict, optimizer_factory):
+    """Pool initializer: map the published μ/Σ instead of unpickling a copy."""
+    views = attach(handle)
+    _init_worker(views.arrays["expected_returns"], views.arrays["covariance"],
+                 views.expected_returns.index, optimizer_factory)
+
+
+def _slice(positions: np.ndarray) -> Tuple[pd.Series, pd.DataFrame]:
+    """
+    Sub-matrix for a portfolio. Contiguous position runs are sliced as views;
+    arbitrary subsets fall back to a fancy-index copy.
+    """
+    labels = _SYMBOLS[positions]
+    start, stop = positions[0], positions[-1] + 1
+    if stop - start == len(positions) and np.all(np.diff(positions) == 1):
+        mu = _MU[start:stop]
+        sigma = _SIGMA[start:stop, start:stop]
+    else:
+        mu = _MU[positions]
+        sigma = _SIGMA[np.ix_(positions, positions)]
+    return (
+        pd.Series(mu, index=labels, copy=False),
+        pd.DataFrame(sigma, index=labels, columns=labels, copy=False),
+    )
+
+
+def _solve(portfolio_id, positions: np.ndarray, method: str, target_return: Optional[float]):
+    """
+    Solve one portfolio against the worker's shared risk model through the
+    solver chain. Returns (portfolio_id, weights, elapsed_seconds, solver, status, message).
+    """
+    t0 = time.perf_counter()
+    expected_returns, covariance = _slice(positions)
+    try:
+        weights, attempts = OptimizerExecutor(_OPTIMIZER_FACTORY).run(
+            expected_returns, covariance, method=method, target_return=target_return)
+    except Exception as e:
+        w = np.full(len(positions), np.nan)
+        return portfolio_id, w, time.perf_counter() - t0, None, "error", f"{type(e).__name__}: {e}"
+
+    accepted = attempts[-1]
+    status = accepted["status"] if len(attempts) == 1 else "fallback"
+    message = "; ".join(f"{a['solver']}: {a['status']} {a['message']}".strip() for a in attempts[:-1])
+    w = np.asarray(weights.values, dtype=float)
+    return portfolio_id, w, time.perf_counter() - t0, accepted["solver"], status, message
+
+
+class BatchOptimizer:
+    """
+    Optimizes many portfolios that are subsets of one shared universe.
+
+    μ/Σ are estimated once for the union universe and published to shared
+    memory; worker processes map it zero-copy at start-up and every task only
+    ships the integer positions of its sub-universe.
+    """
+
+    def __init__(self, optimizer_factory, max_workers: Optional[int] = None):
+        """
+        optimizer_factory: class providing get(method)
+        max_workers: process pool size; 1 (or a single portfolio) runs in-process
+        """
+        self.optimizer_factory = optimizer_factory
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def optimize(
+        self,
+        portfolios: Dict[str, List[str]],
+        expected_returns: pd.Series,
+        covariance: pd.DataFrame,
+        method: str = "mean_variance",
+        target_returns: Optional[Dict[str, float]] = None,
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        portfolios: {portfolio_id: [symbol, ...]} with symbols drawn from expected_returns.index
+        returns: (weights, summary)
+            weights: portfolio_id x symbol table, 0.0 for symbols outside a portfolio
+            summary: per-portfolio n_assets, solver, status, message and solve_time (seconds)
+        """
+        symbols = expected_returns.index
+        covariance = covariance.reindex(index=symbols, columns=symbols)
+        mu = np.ascontiguousarray(expected_returns.values, dtype=float)
+        sigma = np.ascontiguousarray(covariance.values, dtype=float)
+        target_returns = target_returns or {}
+
+        tasks = []
+        for pid, members in portfolios.items():
+            positions = symbols.get_indexer(pd.Index(members).unique())
+            if (positions < 0).any():
+                missing = [m for m, p in zip(pd.Index(members).unique(), positions) if p < 0]
+                raise ValueError(f"Portfolio {pid!r} has symbols outside the universe: {missing}")
+            tasks.append((pid, np.sort(positions), method, target_returns.get(pid)))
+
+        results = []
+        if self.max_workers <= 1 or len(tasks) <= 1:
+            _init_worker(mu, sigma, symbols, self.optimizer_factory)
+            results = [_solve(*task) for task in tasks]
+        else:
+            with SharedRiskModel.publish(expected_returns=expected_returns, covariance=covariance) as model:
+                with ProcessPoolExecutor(
+                    max_workers=min(self.max_workers, len(tasks)),
+                    initializer=_init_shared_worker,
+                    initargs=(model.handle, self.optimizer_factory),
+                ) as pool:
+                    futures = [pool.submit(_solve, *task) for task in tasks]
+                    for future in as_completed(futures):
+                        results.append(future.result())
+
+        positions_by_id = {task[0]: task[1] for task in tasks}
+        weights = np.zeros((len(tasks), len(symbols)))
+        row_of = {pid: i for i, pid in enumerate(positions_by_id)}
+        summary_rows = {}
+        for pid, w, elapsed, solver, status, message in results:
+            weights[row_of[pid], positions_by_id[pid]] = w
+            summary_rows[pid] = {
+                "n_assets": len(w),
+                "solver": solver,
+                "status": status,
+                "message": message,
+                "solve_time": elapsed,
+            }
+
+        index = pd.Index(list(positions_by_id), name="portfolio")
+        weights_df = pd.DataFrame(weights, index=index, columns=symbols)
+        summary_df = pd.DataFrame.from_dict(summary_rows, orient="index").reindex(index)
+        return weights_df, summary_df
@@ -0,0 +1,134 @@
+# portfolio/black_litterman.py
+
+"""
+Black-Litterman expected returns.
+
+Prior (equilibrium) returns implied by market weights w and risk aversion δ:
+    π = r_f + δ Σ w
+
+Posterior with K views P μ = Q ± Ω, written so that only K×K systems are solved:
+    A    = P τΣ Pᵀ + Ω
+    μ_BL = π + τΣ Pᵀ A⁻¹ (Q − P π)
+    Σ_BL = Σ + τΣ − τΣ Pᵀ A⁻¹ P τΣ
+
+The prior and τΣ are cached per (Σ fingerprint, weights, δ, τ, r_f), so
+re-running with different views costs O(N²K + K³) instead of any O(N³)
+factorization of Σ.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.linalg import cho_factor, cho_solve
+
+
+class BlackLitterman:
+    """
+    Blends investor views into equilibrium returns; output feeds any optimizer.
+    """
+
+    # Shared across instances so a new PortfolioManager run on the same Σ reuses the prior
+    _prior_cache: "OrderedDict[str, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+    cache_size = 16
+
+    def __init__(self, covariance: pd.DataFrame, market_weights: Optional[pd.Series] = None,
+                 risk_aversion: float = 2.5, tau: float = 0.05, risk_free_rate: float = 0.0):
+        """
+        covariance: annualized Σ (e.g. from compute_expected_returns_covariance)
+        market_weights: market-cap (or any given) weights; normalized, equal weights if None
+        risk_aversion: δ used to back out equilibrium returns
+        tau: scaling of the uncertainty of the prior
+        """
+        self.symbols = covariance.index
+        self.covariance = covariance
+        if market_weights is None:
+            w = np.full(len(self.symbols), 1.0 / len(self.symbols))
+        else:
+            w = market_weights.reindex(self.symbols).fillna(0.0).values.astype(float)
+            w = w / w.sum()
+        self.market_weights = pd.Series(w, index=self.symbols)
+        self.risk_aversion = risk_aversion
+        self.tau = tau
+        self.risk_free_rate = risk_free_rate
+        self._pi, self._tau_sigma = self._prior()
+
+    @property
+    def prior(self) -> pd.Series:
+        """Equilibrium expected returns π."""
+        return pd.Series(self._pi, index=self.symbols, name="prior")
+
+    def _prior(self) -> Tuple[np.ndarray, np.ndarray]:
+        Sigma = np.ascontiguousarray(self.covariance.values, dtype=float)
+        h = hashlib.blake2b(digest_size=16)
+        h.update("\x1f".join(map(str, self.symbols)).encode())
+        h.update(Sigma.tobytes())
+        h.update(self.market_weights.values.tobytes())
+        h.update(np.array([self.risk_aversion, self.tau, self.risk_free_rate]).tobytes())
+        key = h.hexdigest()
+
+        cache = BlackLitterman._prior_cache
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+
+        pi = self.risk_free_rate + self.risk_aversion * Sigma @ self.market_weights.values
+        entry = (pi, self.tau * Sigma)
+        cache[key] = entry
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return entry
+
+    def views_from_dicts(self, views: List[Dict]) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """
+        views: [{"assets": {"AAPL": 1, "MSFT": -1}, "return": 0.02, "variance": 0.001?}, ...]
+               absolute view: one asset with weight 1; relative view: weights summing to 0
+        returns: (P, Q, omega_diag or None if no view gives a variance)
+        """
+        P = np.zeros((len(views), len(self.symbols)))
+        Q = np.zeros(len(views))
+        variances = []
+        for k, view in enumerate(views):
+            for symbol, weight in view["assets"].items():
+                pos = self.symbols.get_loc(symbol)
+                P[k, pos] = weight
+            Q[k] = view["return"]
+            variances.append(view.get("variance"))
+        if all(v is None for v in variances):
+            return P, Q, None
+        default = np.diag(P @ self._tau_sigma @ P.T)
+        omega = np.array([d if v is None else v for v, d in zip(variances, default)], dtype=float)
+        return P, Q, omega
+
+    def posterior(self, P, Q, omega=None) -> Tuple[pd.Series, pd.DataFrame]:
+        """
+        P: K x N pick matrix (array or DataFrame with asset columns)
+        Q: K view returns
+        omega: K x K view covariance or K variances; defaults to diag(P τΣ Pᵀ) (He-Litterman)
+        returns: (posterior expected returns, posterior covariance)
+        """
+        if isinstance(P, pd.DataFrame):
+            P = P.reindex(columns=self.symbols).fillna(0.0).values
+        P = np.atleast_2d(np.asarray(P, dtype=float))
+        Q = np.asarray(Q, dtype=float).ravel()
+        if P.shape != (len(Q), len(self.symbols)):
+            raise ValueError(f"P must be {len(Q)} x {len(self.symbols)}, got {P.shape}")
+
+        tau_sigma_pt = self._tau_sigma @ P.T          # N x K
+        A = P @ tau_sigma_pt                           # K x K
+        if omega is None:
+            omega = np.diag(np.diag(A))
+        omega = np.asarray(omega, dtype=float)
+        A = A + (np.diag(omega) if omega.ndim == 1 else omega)
+
+        factor = cho_factor(A)
+        mu_bl = self._pi + tau_sigma_pt @ cho_solve(factor, Q - P @ self._pi)
+        Sigma = self.covariance.values
+        cov_bl = Sigma + self._tau_sigma - tau_sigma_pt @ cho_solve(factor, tau_sigma_pt.T)
+
+        return (
+            pd.Series(mu_bl, index=self.symbols),
+            pd.DataFrame(cov_bl, index=self.symbols, columns=self.symbols),
+        )
@@ -1,8 +1,12 @@
 # portfolio/manager.py
 
+import hashlib
+import threading
+from collections import OrderedDict
+
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 
 class PortfolioManager:
     """
@@ -10,25 +14,44 @@ class PortfolioManager:
     computing returns/covariance, and running optimization & analysis.
     """
 
-    def __init__(self, asset_factory, data_factory, optimizer_factory, analyzer):
+    # Shared across instances: the app and the service build a fresh manager per job.
+    _engine_cache: "OrderedDict[str, object]" = OrderedDict()
+    _engine_lock = threading.Lock()
+    engine_cache_size = 4
+
+    def __init__(self, asset_factory, data_factory, optimizer_factory, analyzer, aligner=None, executor=None,
+                 bond_stage=None):
         """
         Provide factories/classes (not instances) so we can inject mocks in tests.
         asset_factory: class providing create(...)
         data_factory: class providing get_fetcher_for_asset_type(...)
         optimizer_factory: class providing get(method)
         analyzer: an analyzer instance with analyze(price_df, weights)
+        aligner: PriceAligner used by fetch_prices (defaults to the 'intersection' policy)
+        executor: OptimizerExecutor used by optimize (defaults to the standard solver chain)
+        bond_stage: BondDataStage converting bond yields to total-return indices
         """
+        from data_fetcher.bond_returns import BondDataStage
+        from optimizer.execution import OptimizerExecutor
+        from portfolio.price_alignment import PriceAligner
         self.asset_factory = asset_factory
         self.data_factory = data_factory
         self.optimizer_factory = optimizer_factory
         self.analyzer = analyzer
+        self.aligner = aligner or PriceAligner("intersection")
+        self.last_alignment_report: Optional[Dict] = None
+        # Annualization factor of the last aligned prices (52 under weekly 'resample')
+        self.periods_per_year: int = self.aligner.periods_per_year
+        self.executor = executor or OptimizerExecutor(optimizer_factory)
+        self.last_solver_attempts: List[Dict] = []
+        self.bond_stage = bond_stage or BondDataStage()
 
     def build_collection_from_specs(self, specs: List[Dict]) -> "AssetCollection":
         """
         specs: list of dicts: {"asset_type": "stock", "name": "...", "symbol": "...", ...}
         returns: AssetCollection
         """
-        from assets.asset_collection import AssetCollection
+        from assests.asset_collection import AssetCollection
         collection = AssetCollection()
         for s in specs:
             # map keys so factory signature matches
@@ -41,10 +64,32 @@ class PortfolioManager:
             collection.add_asset(asset)
         return collection
 
-    def fetch_prices(self, asset_collection, start_date: str, end_date: str) -> pd.DataFrame:
-        """Fetch price series for all assets and align them."""
+    def fetch_prices(self, asset_collection, start_date: str, end_date: str,
+                     on_progress: Optional[Callable[[str, int, int], None]] = None) -> pd.DataFrame:
+        """
+        Fetch price series for all assets and align them.
+        on_progress: called as (symbol, fetched, total) after each fetch; may raise to cancel
+        """
         series_list = []
-        for asset in asset_collection.get_assets():
+        assets = asset_collection.get_assets()
+        done = 0
+
+        # Bonds: yields for all bonds in one request, converted to total-return indices
+        bonds = [a for a in assets if a.get_type() == "bond"]
+        if bonds:
+            fetcher = self.data_factory.get_fetcher_for_asset_type("bond")
+            print(f"Fetching {len(bonds)} bond series using {fetcher.__class__.__name__}...")
+            try:
+                series_list.extend(self.bond_stage.fetch(bonds, fetcher, start_date, end_date))
+            except Exception as e:
+                print(f"WARNING: failed to fetch bonds: {e}")
+            done += len(bonds)
+            if on_progress is not None:
+                on_progress("bonds", done, len(assets))
+
+        for asset in assets:
+            if asset.get_type() == "bond":
+                continue
             fetcher = self.data_factory.get_fetcher_for_asset_type(asset.get_type())
             print(fetcher)
             symbol = asset.get_symbol().strip()
@@ -64,44 +109,234 @@ class PortfolioManager:
                     series_list.append(s)
             except Exception as e:
                 print(f"WARNING: failed to fetch {symbol}: {e}")
+            done += 1
+            if on_progress is not None:
+                on_progress(symbol, done, len(assets))
 
         if not series_list:
             raise RuntimeError("No price series fetched for any asset.")
 
-        # Outer join with forward/backfill to align all assets
-        price_df = pd.concat(series_list, axis=1, join='outer').ffill().bfill()
+        # Calendar-aware alignment (no back-filling of prices into the past)
+        price_df, report = self.aligner.align(series_list)
+        self.last_alignment_report = report
+        self.periods_per_year = report["periods_per_year"]
+        print(f"Aligned {len(series_list)} series with '{report['policy']}': "
+              f"{report['rows_out']} rows kept, {report['rows_dropped']} dropped vs. outer join")
         return price_df
 
+    def holdings(self, asset_collection, weights) -> pd.DataFrame:
+        """
+        Weights joined with each asset's type and metadata, indexed by symbol.
+        Symbols missing from the collection are skipped.
+        """
+        rows = [{"symbol": asset.get_symbol(), "type": asset.get_type(), **asset.get_metadata(), "weight": float(w)}
+                for asset, w in asset_collection.map_weights(weights)]
+        return pd.DataFrame(rows).set_index("symbol") if rows else pd.DataFrame(columns=["type", "weight"])
+
     def compute_expected_returns_covariance(self, price_df: pd.DataFrame):
-        """Compute annualized returns, covariance and daily returns."""
+        """
+        Compute annualized returns, covariance and per-period ("daily") returns.
+        Annualized with self.periods_per_year, i.e. the frequency of the last aligned prices.
+        """
         daily_returns = price_df.pct_change().dropna()
-        expected_returns = daily_returns.mean() * 252
-        covariance = daily_returns.cov() * 252
+        expected_returns = daily_returns.mean() * self.periods_per_year
+        covariance = daily_returns.cov() * self.periods_per_year
 
         # Regularize covariance to prevent singular matrix issues
         covariance += np.eye(len(covariance)) * 1e-6
 
         return expected_returns, covariance, daily_returns
 
-    def optimize(self, expected_returns, covariance, method: Optional[str] = "mean_variance", target_return: Optional[float] = None):
-        optimizer = self.optimizer_factory.get(method)
+    def publish_risk_model(self, price_df: pd.DataFrame):
+        """
+        Publish prices, daily returns, mu and Sigma to shared memory for worker processes.
+        returns: SharedRiskModel (use as a context manager; pass .handle to workers,
+                 which call portfolio.shared_risk_model.attach(handle) for zero-copy views)
+        """
+        from portfolio.shared_risk_model import SharedRiskModel
+        expected_returns, covariance, daily_returns = self.compute_expected_returns_covariance(price_df)
+        return SharedRiskModel.publish(price_df=price_df, daily_returns=daily_returns,
+                                       expected_returns=expected_returns, covariance=covariance)
+
+    def black_litterman(self, covariance, views: Optional[List[Dict]] = None, market_weights=None,
+                        risk_aversion: float = 2.5, tau: float = 0.05, P=None, Q=None, omega=None):
+        """
+        Black-Litterman posterior mu/Sigma to pass to optimize() with any method.
+        views: [{"assets": {"AAPL": 1}, "return": 0.12}, ...] or explicit P, Q (and omega)
+        market_weights: market-cap or given weights for the equilibrium prior (equal if None)
+        returns: (expected_returns, covariance)
+        """
+        from portfolio.black_litterman import BlackLitterman
+        risk_free_rate = getattr(self.analyzer, "risk_free_rate", 0.0)
+        bl = BlackLitterman(covariance, market_weights, risk_aversion=risk_aversion, tau=tau,
+                            risk_free_rate=risk_free_rate)
+        if views:
+            P, Q, omega = bl.views_from_dicts(views)
+        if P is None:
+            return bl.prior, covariance * (1.0 + tau)
+        return bl.posterior(P, Q, omega)
+
+    def stress_test(self, daily_returns: pd.DataFrame, weights, covariance: Optional[pd.DataFrame] = None,
+                    engine=None):
+        """
+        Evaluate weights (Series, or DataFrame [portfolio x symbol] for many portfolios)
+        under historical windows and shocks.
+        engine: a ScenarioEngine with custom scenarios; rolling 21-day historical windows
+                plus correlation spikes over daily_returns if None
+        returns: (pnl, volatility), DataFrames [scenario x portfolio]
+        """
+        if engine is None:
+            engine = self.scenario_engine(daily_returns, covariance)
+        return engine.evaluate(weights)
+
+    def scenario_engine(self, daily_returns: pd.DataFrame, covariance: Optional[pd.DataFrame] = None):
+        """
+        Default ScenarioEngine for these inputs, reused while daily_returns/covariance are
+        unchanged so repeated stress tests hit its per-portfolio result cache.
+        """
+        from portfolio.stress_test import ScenarioEngine
+        h = hashlib.blake2b(digest_size=16)
+        h.update("\x1f".join(map(str, daily_returns.columns)).encode())
+        h.update(pd.util.hash_pandas_object(daily_returns.index).values.tobytes())
+        h.update(str(self.periods_per_year).encode())
+        h.update(np.ascontiguousarray(daily_returns.values, dtype=float).tobytes())
+        if covariance is not None:
+            h.update(np.ascontiguousarray(covariance.values, dtype=float).tobytes())
+        key = h.hexdigest()
+
+        cache = PortfolioManager._engine_cache
+        with PortfolioManager._engine_lock:
+            engine = cache.get(key)
+            if engine is not None:
+                cache.move_to_end(key)
+                return engine
+        # Built outside the lock; if another job got there first, its engine wins
+        # Same ~1 month windows every ~week whatever the price frequency
+        scale = self.periods_per_year / 252
+        engine = ScenarioEngine.with_default_scenarios(daily_returns, window=max(2, round(21 * scale)),
+                                                       step=max(1, round(5 * scale)), covariance=covariance,
+                                                       periods_per_year=self.periods_per_year)
+        with PortfolioManager._engine_lock:
+            engine = cache.setdefault(key, engine)
+            cache.move_to_end(key)
+            while len(cache) > self.engine_cache_size:
+                cache.popitem(last=False)
+        return engine
+
+    def optimize(self, expected_returns, covariance, method: Optional[str] = "mean_variance", target_return: Optional[float] = None,
+                 optimizer_options: Optional[Dict] = None):
+        """
+        optimizer_options: constructor arguments for the optimizer, e.g.
+            {"daily_returns": daily_returns, "n_resamples": 500} for method="resampled"
+        Runs the executor's ranked solver chain; per-attempt telemetry is kept in
+        self.last_solver_attempts. Raises SolverChainFailed if no solver meets the
+        constraints (e.g. an unreachable target_return).
+        """
+        from optimizer.execution import SolverChainFailed
         try:
-            # Most optimizers accept target_return
-            weights = optimizer.optimize(expected_returns, covariance, target_return)  # type: ignore
-        except TypeError:
-            # fallback: call without target_return
-            weights = optimizer.optimize(expected_returns, covariance)  # type: ignore
-        except RuntimeError as e:
-            # Catch optimization failures and provide a fallback equal-weight solution
-            print(f"Optimization failed: {e}. Using equal weights as fallback.")
-            weights = pd.Series(1 / len(expected_returns), index=expected_returns.index)
-        # Ensure weights sum to 1
-        weights = weights / weights.sum()
+            weights, attempts = self.executor.run(expected_returns, covariance, method=method,
+                                                  target_return=target_return, optimizer_options=optimizer_options)
+        except SolverChainFailed as e:
+            self.last_solver_attempts = e.attempts
+            raise
+        self.last_solver_attempts = attempts
+        for a in attempts:
+            if a["status"] != "ok":
+                print(f"WARNING: solver {a['solver']} {a['status']} after {a['time']:.3f}s: {a['message']}")
         return weights
 
+    def optimize_batch(self, portfolio_specs: Dict[str, List[Dict]], start_date: str, end_date: str,
+                       method: Optional[str] = "mean_variance", target_returns: Optional[Dict[str, float]] = None,
+                       max_workers: Optional[int] = None):
+        """
+        Optimize many portfolios drawn from one shared universe.
+        portfolio_specs: {portfolio_id: [spec, ...]} using the same spec dicts as build_collection_from_specs
+        Prices and mu/Sigma are fetched/estimated once for the union of all symbols.
+        returns: (weights table [portfolio x symbol], summary [n_assets, status, message, solve_time]),
+                 one row per requested portfolio in input order; one without any priced symbol
+                 gets NaN weights and status 'error'
+        """
+        from portfolio.batch_optimizer import BatchOptimizer
+
+        union_specs = {}
+        portfolios = {}
+        for pid, specs in portfolio_specs.items():
+            portfolios[pid] = []
+            for s in specs:
+                symbol = s.get("symbol").strip()
+                union_specs.setdefault(symbol, s)
+                portfolios[pid].append(symbol)
+
+        collection = self.build_collection_from_specs(list(union_specs.values()))
+        price_df = self.fetch_prices(collection, start_date, end_date)
+        expected_returns, covariance, _ = self.compute_expected_returns_covariance(price_df)
+
+        # Drop symbols whose prices could not be fetched
+        available = set(expected_returns.index)
+        requested = portfolios
+        portfolios = {pid: [s for s in syms if s in available] for pid, syms in requested.items()}
+        unpriced = [pid for pid, syms in portfolios.items() if not syms]
+        portfolios = {pid: syms for pid, syms in portfolios.items() if syms}
+
+        batch = BatchOptimizer(self.optimizer_factory, max_workers=max_workers)
+        if portfolios:
+            weights, summary = batch.optimize(portfolios, expected_returns, covariance, method=method,
+                                              target_returns=target_returns)
+        else:
+            weights = pd.DataFrame(columns=expected_returns.index, dtype=float)
+            summary = pd.DataFrame(columns=["n_assets", "solver", "status", "message", "solve_time"])
+
+        # Portfolios with no priced symbol at all get an error row, like other per-portfolio failures
+        for pid in unpriced:
+            weights.loc[pid] = np.nan
+            summary.loc[pid] = {"n_assets": 0, "solver": None, "status": "error", "solve_time": 0.0,
+                                "message": f"no prices fetched for any of {requested[pid]}"}
+        order = pd.Index(list(requested), name="portfolio")
+        return weights.reindex(order), summary.reindex(order)
+
+    def efficient_frontier(self, expected_returns, covariance, n_points: int = 20) -> pd.DataFrame:
+        """
+        Trace the mean-variance frontier by solving for evenly spaced target returns.
+        Infeasible targets are skipped.
+        returns: DataFrame[target_return, expected_return, volatility]
+        """
+        optimizer = self.optimizer_factory.get("mean_variance", solver="slsqp")
+        mu = expected_returns.values
+        Sigma = covariance.values
+        points = []
+        for target in np.linspace(mu.min(), mu.max(), n_points):
+            try:
+                weights = optimizer.optimize(expected_returns, covariance, target)  # type: ignore
+            except RuntimeError:
+                continue
+            w = weights.values / weights.values.sum()
+            points.append({
+                "target_return": float(target),
+                "expected_return": float(w @ mu),
+                "volatility": float(np.sqrt(w @ Sigma @ w)),
+            })
+        return pd.DataFrame(points, columns=["target_return", "expected_return", "volatility"])
+
     def analyze_portfolio(self, price_df: pd.DataFrame, weights):
         """
         Use analyzer to compute portfolio-level metrics.
-        analyzer is expected to implement analyze(price_data, weights) -> dict
+        analyzer is expected to implement analyze(price_data, weights, periods_per_year) -> dict
         """
-        return self.analyzer.analyze(price_df, weights)
+        return self.analyzer.analyze(price_df, weights, periods_per_year=self.periods_per_year)
+
+    def attribute_portfolio(self, price_df: pd.DataFrame, weights, benchmark: Optional[str] = None,
+                            benchmark_type: str = "etf", window: int = 63) -> Dict:
+        """
+        Risk attribution for the portfolio; betas are computed against `benchmark`
+        (fetched over the price_df date range) when one is given.
+        """
+        benchmark_prices = None
+        if benchmark:
+            fetcher = self.data_factory.get_fetcher_for_asset_type(benchmark_type)
+            start, end = price_df.index[0], price_df.index[-1] + pd.Timedelta(days=1)
+            try:
+                benchmark_prices = fetcher.fetch_data(benchmark, f"{start:%Y-%m-%d}", f"{end:%Y-%m-%d}")
+            except Exception as e:
+                print(f"WARNING: failed to fetch benchmark {benchmark}: {e}")
+        return self.analyzer.attribution(price_df, weights, benchmark_prices, window,
+                                         periods_per_year=self.periods_per_year)
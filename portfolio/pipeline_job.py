@@ -0,0 +1,179 @@
+# portfolio/pipeline_job.py
+
+"""
+Background fetch → optimize → analyze pipeline with progress events and
+cooperative cancellation, so an interactive front end (app1.py) can poll a
+running job instead of blocking on it.
+
+Cancellation is checked between stages and from the progress hooks the
+pipeline already exposes (per-symbol fetch progress, solver iterations,
+resample chunks), so a cancelled job stops at the next hook.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+
+class JobCancelled(Exception):
+    """Raised inside the job thread when cancel() has been requested."""
+
+
+class PipelineJob:
+    """
+    Runs one optimization pipeline on a daemon thread.
+
+    status: 'running' → 'done' | 'failed' | 'cancelled'
+    events: [{"time", "stage", "message"}, ...] in order
+    progress: {stage: fraction in [0, 1]}
+    """
+
+    STAGES = ("fetch", "estimate", "optimize", "analyze")
+
+    def __init__(self, make_manager: Callable, specs: List[Dict], start_date: str, end_date: str,
+                 method: str = "mean_variance", optimizer_options: Optional[Dict] = None,
+                 benchmark: Optional[str] = None, key: Optional[str] = None, on_finished: Optional[Callable[["PipelineJob"], None]] = None):
+        """
+        make_manager: callable(on_iteration) -> PortfolioManager; on_iteration must be wired
+                      into the manager's OptimizerExecutor so solver progress is reported
+        optimizer_options: constructor options for the optimizer (e.g. max_holdings for 'sparse')
+        benchmark: symbol the attribution betas are computed against
+        key: fingerprint of the inputs, used by callers to detect stale jobs
+        on_finished: called on the job thread with the finished job (e.g. to persist results)
+        """
+        self.make_manager = make_manager
+        self.specs = specs
+        self.start_date = start_date
+        self.end_date = end_date
+        self.method = method
+        self.optimizer_options = optimizer_options
+        self.benchmark = benchmark
+        self.key = key
+        self.on_finished = on_finished
+
+        self.status = "running"
+        self.result: Optional[Dict] = None
+        self.error: Optional[BaseException] = None
+        self.progress: Dict[str, float] = {stage: 0.0 for stage in self.STAGES}
+        self._events: List[Dict] = []
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"pipeline-{key or id(self)}", daemon=True)
+
+    def start(self) -> "PipelineJob":
+        self._thread.start()
+        return self
+
+    @property
+    def running(self) -> bool:
+        return self.status == "running"
+
+    @property
+    def events(self) -> List[Dict]:
+        with self._lock:
+            return list(self._events)
+
+    def cancel(self):
+        """Request cooperative cancellation; the job stops at its next checkpoint."""
+        self._cancel.set()
+
+    def join(self, timeout: Optional[float] = None):
+        self._thread.join(timeout)
+
+    def _emit(self, stage: str, message: str, fraction: Optional[float] = None):
+        self._check()
+        with self._lock:
+            self._events.append({"time": time.time(), "stage": stage, "message": message})
+            if fraction is not None:
+                self.progress[stage] = min(max(fraction, 0.0), 1.0)
+
+    def _check(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def _on_iteration(self, solver: str, iteration: int):
+        self._check()
+        if iteration % 10 == 0:
+            self._emit("optimize", f"{solver}: iteration {iteration}")
+
+    def _run(self):
+        timings = {}
+        try:
+            manager = self.make_manager(self._on_iteration)
+
+            t0 = time.perf_counter()
+            self._emit("fetch", f"Fetching {len(self.specs)} assets...", 0.0)
+            collection = manager.build_collection_from_specs(self.specs)
+            price_df = manager.fetch_prices(
+                collection, self.start_date, self.end_date,
+                on_progress=lambda symbol, done, total: self._emit("fetch", f"Fetched {symbol} ({done}/{total})", done / total),
+            )
+            # Narrow to the symbols that were actually priced
+            collection = collection.select(s for s in price_df.columns if s in collection)
+            timings["fetch"] = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            self._emit("estimate", "Estimating returns and covariance...", 0.0)
+            expected_returns, covariance, daily_returns = manager.compute_expected_returns_covariance(price_df)
+            self._emit("estimate", f"Estimated {len(expected_returns)} assets over {len(daily_returns)} days", 1.0)
+            timings["estimate"] = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            optimizer_options = dict(self.optimizer_options or {}) or None
+            if self.method == "resampled":
+                optimizer_options = {
+                    **(optimizer_options or {}),
+                    "daily_returns": daily_returns,
+                    "periods_per_year": manager.periods_per_year,
+                    "progress": lambda done, total: self._emit("optimize", f"Resampled {done}/{total}", done / total),
+                }
+            self._emit("optimize", f"Optimizing with '{self.method}'...")
+            weights = manager.optimize(expected_returns, covariance, method=self.method,
+                                       optimizer_options=optimizer_options)
+            weights = weights / weights.sum()
+            timings["optimize"] = time.perf_counter() - t0
+            solved = manager.last_solver_attempts[-1]
+            note = f" ({solved['message']})" if solved["status"] == "truncated" else ""
+            self._emit("optimize", f"Solved by '{solved['solver']}'{note}", 1.0)
+
+            t0 = time.perf_counter()
+            self._emit("analyze", "Analyzing portfolio...", 0.0)
+            analysis = manager.analyze_portfolio(price_df, weights)
+            self._emit("analyze", "Computing risk attribution...", 0.5)
+            attribution = manager.attribute_portfolio(price_df, weights, self.benchmark)
+            self._emit("analyze", "Replaying stress scenarios...", 0.75)
+            stress_pnl, stress_vol = manager.stress_test(daily_returns, weights.rename("portfolio"), covariance)
+            timings["analyze"] = time.perf_counter() - t0
+            self._emit("analyze", "Analysis complete", 1.0)
+
+            self.result = {
+                "price_df": price_df,
+                "alignment": manager.last_alignment_report,
+                "expected_returns": expected_returns,
+                "covariance": covariance,
+                "daily_returns": daily_returns,
+                "weights": weights,
+                "holdings": manager.holdings(collection, weights),
+                "solver_attempts": manager.last_solver_attempts,
+                "analysis": analysis,
+                "attribution": attribution,
+                "stress": pd.DataFrame({"pnl": stress_pnl["portfolio"], "volatility": stress_vol["portfolio"]}),
+                "timings": timings,
+            }
+            status = "done"
+        except JobCancelled:
+            status = "cancelled"
+        except Exception as e:
+            self.error = e
+            status = "failed"
+
+        # Before publishing the status, so pollers see everything on_finished adds (e.g. run_id)
+        if self.on_finished is not None and status == "done":
+            try:
+                self.on_finished(self)
+            except Exception as e:
+                with self._lock:
+                    self._events.append({"time": time.time(), "stage": "finish", "message": f"on_finished failed: {e}"})
+        self.status = status
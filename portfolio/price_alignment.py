@@ -0,0 +1,136 @@
+# portfolio/price_alignment.py
+
+import numpy as np
+import pandas as pd
+from functools import reduce
+from typing import Dict, List, Optional, Tuple, Union
+
+POLICIES = ("intersection", "calendar", "resample")
+TRADING_DAYS = 252
+
+
+def periods_per_year(freq: str) -> int:
+    """Observations per year at `freq`: trading days for daily offsets, else calendar periods (52 for 'W-FRI')."""
+    offset = pd.tseries.frequencies.to_offset(freq)
+    if isinstance(offset, (pd.offsets.Day, pd.offsets.BusinessDay)):
+        return max(1, round(TRADING_DAYS / offset.n))
+    return max(1, round(len(pd.date_range("2000-01-01", "2019-12-31", freq=offset)) / 20))
+
+
+class PriceAligner:
+    """
+    Aligns price series that live on different calendars (7-day crypto,
+    5-day equities, FRED business days) onto one date index.
+
+    Policies:
+    - 'intersection': keep only dates on which every series has a print
+    - 'calendar':     project every series onto a master trading calendar,
+                      forward-filling (never back-filling) gaps up to max_fill_days
+    - 'resample':     take the last print per period of `freq` (e.g. 'W-FRI'),
+                      then keep the periods every series covers
+
+    Each series is placed with a single indexer lookup against the sorted
+    target index instead of chained reindex/ffill/bfill passes.
+
+    periods_per_year (also in the report) is the annualization factor for
+    returns on the aligned index: 252 for daily policies, 52 for 'W-FRI'.
+    """
+
+    def __init__(self, policy: str = "intersection",
+                 calendar: Union[pd.DatetimeIndex, str, None] = None,
+                 freq: str = "W-FRI", max_fill_days: Optional[int] = 5):
+        """
+        calendar: master DatetimeIndex, or the symbol whose dates define the calendar;
+                  defaults to business days over the common date range ('calendar' policy)
+        freq: pandas offset alias used by the 'resample' policy
+        max_fill_days: maximum age of a forward-filled price ('calendar' policy), None = unlimited
+        """
+        policy = policy.lower()
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown alignment policy: {policy}")
+        self.policy = policy
+        self.calendar = calendar
+        self.freq = freq
+        self.max_fill_days = max_fill_days
+
+    @property
+    def periods_per_year(self) -> int:
+        return periods_per_year(self.freq) if self.policy == "resample" else TRADING_DAYS
+
+    def align(self, series_list: List[pd.Series]) -> Tuple[pd.DataFrame, Dict]:
+        """
+        returns: (price_df, report)
+            report: policy, rows_union (row count an outer join would give),
+                    rows_out, rows_dropped, per-symbol filled counts and periods_per_year
+        """
+        if not series_list:
+            raise ValueError("No price series to align.")
+        series_list = [self._clean(s) for s in series_list]
+        rows_union = len(reduce(lambda a, b: a.union(b), (s.index for s in series_list)))
+
+        if self.policy == "resample":
+            series_list = [s.resample(self.freq).last().dropna() for s in series_list]
+
+        if self.policy == "calendar":
+            target = self._master_calendar(series_list)
+            values, filled = self._project(series_list, target)
+        else:
+            target = reduce(lambda a, b: a.intersection(b), (s.index for s in series_list))
+            values = np.empty((len(target), len(series_list)))
+            for j, s in enumerate(series_list):
+                values[:, j] = s.values[s.index.get_indexer(target)]
+            filled = {s.name: 0 for s in series_list}
+
+        price_df = pd.DataFrame(values, index=target, columns=[s.name for s in series_list])
+        # Dates before a series' first print (or past max_fill_days) cannot be filled honestly
+        price_df = price_df.dropna(how="any")
+        if price_df.empty:
+            raise RuntimeError(f"No overlapping dates left after '{self.policy}' alignment.")
+
+        report = {
+            "policy": self.policy,
+            "rows_union": rows_union,
+            "rows_out": len(price_df),
+            "rows_dropped": rows_union - len(price_df),
+            "filled": filled,
+            "periods_per_year": self.periods_per_year,
+        }
+        return price_df, report
+
+    @staticmethod
+    def _clean(s: pd.Series) -> pd.Series:
+        idx = pd.DatetimeIndex(s.index)
+        if idx.tz is not None:
+            idx = idx.tz_convert(None)
+        s = pd.Series(s.values, index=idx.normalize(), name=s.name).dropna()
+        s = s[~s.index.duplicated(keep="last")]
+        return s.sort_index()
+
+    def _master_calendar(self, series_list: List[pd.Series]) -> pd.DatetimeIndex:
+        if isinstance(self.calendar, pd.DatetimeIndex):
+            target = self.calendar.sort_values().unique()
+        elif isinstance(self.calendar, str):
+            by_name = {s.name: s for s in series_list}
+            if self.calendar not in by_name:
+                raise ValueError(f"Calendar symbol {self.calendar} was not fetched.")
+            target = by_name[self.calendar].index
+        else:
+            start = max(s.index[0] for s in series_list)
+            end = min(s.index[-1] for s in series_list)
+            target = pd.bdate_range(start, end)
+        return pd.DatetimeIndex(target)
+
+    def _project(self, series_list: List[pd.Series], target: pd.DatetimeIndex):
+        """As-of (forward-fill only) lookup of every series on the target calendar."""
+        values = np.full((len(target), len(series_list)), np.nan)
+        filled = {}
+        limit = None if self.max_fill_days is None else np.timedelta64(self.max_fill_days, "D")
+        for j, s in enumerate(series_list):
+            pos = s.index.get_indexer(target, method="pad")
+            ok = pos >= 0
+            if limit is not None:
+                ok &= (target.values - s.index.values[np.maximum(pos, 0)]) <= limit
+            values[ok, j] = s.values[pos[ok]]
+            exact = s.index.get_indexer(target) >= 0
+            filled[s.name] = int((ok & ~exact).sum())
+        return values, filled
@@ -0,0 +1,167 @@
+# portfolio/shared_risk_model.py
+
+"""
+Publishes the price matrix, daily returns, μ and Σ once into
+multiprocessing.shared_memory so worker processes get zero-copy NumPy
+views instead of a pickled copy per worker (or per task).
+
+Owner side:
+    with SharedRiskModel.publish(price_df=..., daily_returns=..., covariance=...) as model:
+        pool = ProcessPoolExecutor(initializer=init, initargs=(model.handle,))
+
+Worker side:
+    views = attach(handle)
+    views.covariance          # DataFrame over the shared buffer
+    views.arrays["covariance"]  # raw read-only ndarray
+
+Only the owner unlinks the blocks (on close / context exit); workers just
+map them. detach(handle) releases a process's mappings early (the owner's
+close() does it for its own process); otherwise they go when the process exits.
+"""
+
+import os
+import threading
+import uuid
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ("price_df", "daily_returns", "expected_returns", "covariance")
+
+# Worker-side mappings, kept alive until detach() (or process exit)
+_ATTACHED: Dict[str, shared_memory.SharedMemory] = {}
+_VIEWS: Dict[str, SimpleNamespace] = {}
+# Base array over each mapping; a block may only be closed once it is gone
+_BASES: Dict[str, weakref.ref] = {}
+# Mappings detach() could not close yet because arrays over them were still alive
+_LINGERING: List[Tuple[shared_memory.SharedMemory, weakref.ref]] = []
+_LOCK = threading.Lock()
+
+
+def _open_block(name: str, owner_pid: int) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python >= 3.13
+    except TypeError:
+        pass
+    # Older Pythons register every attach with the resource tracker. The publisher and
+    # the pools it starts share one tracker, where that is a no-op; any other process has
+    # its own tracker, which would unlink the block at exit, so drop the registration.
+    shm = shared_memory.SharedMemory(name=name)
+    if os.name == "posix" and owner_pid not in (os.getpid(), os.getppid()):
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def _try_close(shm: shared_memory.SharedMemory, base: weakref.ref) -> bool:
+    # Unmapping under a live array would leave it pointing at freed memory
+    if base() is not None:
+        return False
+    shm.close()
+    return True
+
+
+class SharedRiskModel:
+    """
+    Owner of the shared-memory blocks for one risk model.
+    """
+
+    def __init__(self):
+        self._blocks: Dict[str, shared_memory.SharedMemory] = {}
+        self.handle: Dict = {"id": uuid.uuid4().hex, "pid": os.getpid(), "fields": {}}
+
+    @classmethod
+    def publish(cls, price_df: Optional[pd.DataFrame] = None, daily_returns: Optional[pd.DataFrame] = None,
+                expected_returns: Optional[pd.Series] = None,
+                covariance: Optional[pd.DataFrame] = None) -> "SharedRiskModel":
+        """Copy each given frame into its own shared block (once)."""
+        model = cls()
+        try:
+            for field, obj in zip(FIELDS, (price_df, daily_returns, expected_returns, covariance)):
+                if obj is not None:
+                    model._put(field, obj)
+        except BaseException:
+            model.close()
+            raise
+        return model
+
+    def _put(self, field: str, obj):
+        values = np.ascontiguousarray(obj.values, dtype=np.float64)
+        shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        self._blocks[field] = shm
+        np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[...] = values
+        self.handle["fields"][field] = {
+            "name": shm.name,
+            "shape": values.shape,
+            "dtype": values.dtype.str,
+            "index": obj.index,
+            "columns": getattr(obj, "columns", None),
+        }
+
+    def close(self):
+        """Release and unlink every block. Safe to call more than once."""
+        detach(self.handle)
+        for shm in self._blocks.values():
+            try:
+                shm.close()
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks.clear()
+
+    def __enter__(self) -> "SharedRiskModel":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+
+def attach(handle: Dict) -> SimpleNamespace:
+    """
+    Map a published risk model in this process. Returns a namespace with one
+    pandas object per published field plus `arrays` (read-only ndarrays), all
+    backed by the shared buffers. Repeated calls with the same handle are free.
+    """
+    with _LOCK:
+        if handle["id"] in _VIEWS:
+            return _VIEWS[handle["id"]]
+
+        views = SimpleNamespace(arrays={}, **{f: None for f in FIELDS})
+        for field, meta in handle["fields"].items():
+            shm = _ATTACHED.get(meta["name"]) or _open_block(meta["name"], handle["pid"])
+            _ATTACHED[meta["name"]] = shm
+            arr = np.ndarray(meta["shape"], dtype=np.dtype(meta["dtype"]), buffer=shm.buf)
+            arr.flags.writeable = False
+            _BASES[meta["name"]] = weakref.ref(arr)
+            views.arrays[field] = arr
+            if meta["columns"] is None:
+                setattr(views, field, pd.Series(arr, index=meta["index"], copy=False))
+            else:
+                setattr(views, field, pd.DataFrame(arr, index=meta["index"], columns=meta["columns"], copy=False))
+
+        _VIEWS[handle["id"]] = views
+        return views
+
+
+def detach(handle: Dict):
+    """
+    Drop this process's cached views of a published model and close its mappings.
+    Blocks whose arrays are still referenced elsewhere are closed by a later
+    detach() once those arrays are gone. Safe to call more than once.
+    """
+    with _LOCK:
+        views = _VIEWS.pop(handle["id"], None)
+        if views is not None:
+            views.arrays.clear()
+            for field in FIELDS:
+                setattr(views, field, None)
+        del views
+        blocks = [(_ATTACHED.pop(meta["name"]), _BASES.pop(meta["name"]))
+                  for meta in handle["fields"].values() if meta["name"] in _ATTACHED]
+        _LINGERING[:] = [entry for entry in _LINGERING + blocks if not _try_close(*entry)]
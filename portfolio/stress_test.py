@@ -0,0 +1,253 @@
+# portfolio/stress_test.py
+
+"""
+Stress tests and historical scenario replay for many portfolios at once.
+
+A scenario is a shock vector r_s (per-asset return over the scenario) plus a
+scenario covariance Σ_s. For a weights table W (portfolios x assets):
+    P&L        = R Wᵀ                      (scenarios x portfolios, one matmul)
+    volatility = sqrt(w_pᵀ Σ_s w_p)
+
+Σ_s is never materialized per (scenario, portfolio):
+    - historical windows: Y = X Wᵀ is computed once over the full daily history;
+      each window's portfolio variance comes from cumulative sums of Y and Y²,
+      so any number of (overlapping) windows costs O(S·P) on top of one matmul
+    - factor shocks use m²Σ, correlation spikes m²((1−α)Σ + α σσᵀ), which both
+      reduce to the per-portfolio scalars wᵀΣw and (σ·w)
+    - explicit Σ overrides cost one N x N product each
+
+Results are cached per (scenario, weights fingerprint): every portfolio keeps a
+row of P&L / volatility values aligned with the engine's scenario list, so
+re-evaluating the same weights, or adding scenarios, only computes what is new.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+
+class ScenarioEngine:
+    """
+    Scenario registry and vectorized evaluator over one daily-returns history.
+    """
+
+    cache_size = 4096  # portfolios
+
+    def __init__(self, daily_returns: pd.DataFrame, covariance: Optional[pd.DataFrame] = None,
+                 factor_returns: Optional[pd.DataFrame] = None, periods_per_year: int = TRADING_DAYS):
+        """
+        daily_returns: T x N asset returns (e.g. from compute_expected_returns_covariance)
+        covariance: annualized Σ used by factor shocks and correlation spikes;
+                    daily_returns.cov() * periods_per_year if None
+        factor_returns: optional extra series (indices, rates, ...) that factor shocks
+                        may be expressed in, without being held by any portfolio
+        periods_per_year: rows of daily_returns per year (52 for weekly prices)
+        """
+        self.daily_returns = daily_returns
+        self.symbols = daily_returns.columns
+        self.periods_per_year = periods_per_year
+        self.covariance = (daily_returns.cov() * periods_per_year if covariance is None
+                           else covariance.reindex(index=self.symbols, columns=self.symbols))
+        self.factor_returns = factor_returns
+
+        X = daily_returns.values
+        self._X = X
+        # Buy-and-hold window returns via cumulative log returns
+        self._log_cum = np.vstack([np.zeros(X.shape[1]), np.cumsum(np.log1p(X), axis=0)])
+        self._Sigma = self.covariance.values
+        self._sigma = np.sqrt(np.clip(np.diag(self._Sigma), 0.0, None))
+
+        self.scenarios: List[Dict] = []
+        self._index: Dict[str, int] = {}
+        self._shocks: List[np.ndarray] = []
+        self._cache: "OrderedDict[str, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        # The manager shares engines between PipelineJob threads
+        self._cache_lock = threading.Lock()
+
+    @classmethod
+    def with_default_scenarios(cls, daily_returns: pd.DataFrame, window: int = 21, step: int = 5,
+                               covariance: Optional[pd.DataFrame] = None,
+                               periods_per_year: int = TRADING_DAYS) -> "ScenarioEngine":
+        """Rolling historical windows over the whole history plus a few correlation spikes."""
+        engine = cls(daily_returns, covariance, periods_per_year=periods_per_year)
+        engine.add_historical_windows(window, step)
+        engine.add_correlation_spike("Correlation spike (moderate)", strength=0.5, vol_multiplier=1.5)
+        engine.add_correlation_spike("Correlation spike (severe)", strength=0.9, vol_multiplier=2.0)
+        return engine
+
+    def _register(self, name: str, kind: str, shock: np.ndarray, params: Dict, key_parts) -> str:
+        h = hashlib.blake2b(digest_size=12)
+        h.update(kind.encode())
+        for part in key_parts:
+            h.update(np.ascontiguousarray(part, dtype=float).tobytes() if isinstance(part, np.ndarray)
+                     else repr(part).encode())
+        key = f"{kind}:{h.hexdigest()}"
+        if key in self._index:
+            return key
+        self._index[key] = len(self.scenarios)
+        self.scenarios.append({"key": key, "name": name, "kind": kind, **params})
+        self._shocks.append(np.asarray(shock, dtype=float))
+        return key
+
+    def _shock_vector(self, shock: Optional[Dict[str, float]]) -> np.ndarray:
+        vector = np.zeros(len(self.symbols))
+        for symbol, value in (shock or {}).items():
+            vector[self.symbols.get_loc(symbol)] = value
+        return vector
+
+    def add_historical(self, name: str, start, end) -> str:
+        """Replay the returns between two dates (inclusive) on today's weights."""
+        dates = self.daily_returns.index
+        i = dates.searchsorted(pd.Timestamp(start), side="left")
+        j = dates.searchsorted(pd.Timestamp(end), side="right")
+        if j - i < 2:
+            raise ValueError(f"Scenario '{name}' covers {j - i} trading day(s); need at least 2")
+        shock = np.expm1(self._log_cum[j] - self._log_cum[i])
+        return self._register(name, "historical", shock, {"start": dates[i], "end": dates[j - 1], "rows": (i, j)},
+                              (i, j))
+
+    def add_historical_windows(self, window: int = 21, step: int = 5) -> List[str]:
+        """Every `window`-row stretch of the history, every `step` rows."""
+        dates = self.daily_returns.index
+        unit = "d" if self.periods_per_year == TRADING_DAYS else " periods"
+        return [self.add_historical(f"{dates[i]:%Y-%m-%d} +{window}{unit}", dates[i], dates[i + window - 1])
+                for i in range(0, len(dates) - window + 1, step)]
+
+    def add_factor_shock(self, name: str, shocks: Dict[str, float], vol_multiplier: float = 1.0) -> str:
+        """
+        shocks: {factor: return}, factors being assets or columns of factor_returns.
+        Every asset moves by its regression on the shocked factors:
+            r = Cov(assets, F) Cov(F, F)⁻¹ q
+        """
+        factors = list(shocks)
+        joint = self.daily_returns
+        extra = [f for f in factors if f not in self.symbols]
+        if extra:
+            if self.factor_returns is None or any(f not in self.factor_returns.columns for f in extra):
+                raise ValueError(f"Unknown factor(s) {extra}; pass them as factor_returns")
+            joint = pd.concat([joint, self.factor_returns[extra]], axis=1, join="inner")
+        Z = joint.values - joint.values.mean(axis=0)
+        F = Z[:, [joint.columns.get_loc(f) for f in factors]]
+        q = np.array([shocks[f] for f in factors], dtype=float)
+        cov_af = Z[:, :len(self.symbols)].T @ F
+        shock = cov_af @ np.linalg.lstsq(F.T @ F, q, rcond=None)[0]
+        return self._register(name, "factor", shock, {"shocks": dict(shocks), "scale": vol_multiplier ** 2,
+                                                      "rank_one": 0.0},
+                              (sorted(shocks.items()), vol_multiplier))
+
+    def add_correlation_spike(self, name: str, strength: float = 0.5, vol_multiplier: float = 1.0,
+                              shock: Optional[Dict[str, float]] = None) -> str:
+        """
+        Pull every correlation toward 1: ρ̃ = (1 − strength) ρ + strength, with all
+        volatilities scaled by vol_multiplier. shock: optional per-asset returns.
+        """
+        if not 0.0 <= strength <= 1.0:
+            raise ValueError(f"strength must be in [0, 1], got {strength}")
+        m2 = vol_multiplier ** 2
+        return self._register(name, "spike", self._shock_vector(shock),
+                              {"strength": strength, "scale": m2 * (1.0 - strength), "rank_one": m2 * strength},
+                              (strength, vol_multiplier, sorted((shock or {}).items())))
+
+    def add_covariance_override(self, name: str, covariance: pd.DataFrame,
+                                shock: Optional[Dict[str, float]] = None) -> str:
+        """Arbitrary annualized Σ for the scenario (costs one N x N product per evaluation)."""
+        Sigma = covariance.reindex(index=self.symbols, columns=self.symbols).values.astype(float)
+        return self._register(name, "override", self._shock_vector(shock), {"covariance": Sigma},
+                              (Sigma, sorted((shock or {}).items())))
+
+    def _fingerprint(self, w: np.ndarray) -> str:
+        return hashlib.blake2b(w.tobytes(), digest_size=16).hexdigest()
+
+    def _compute(self, W: np.ndarray, idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """P&L and volatility for scenarios `idx` x portfolios W (P x N), as S x P arrays."""
+        R = np.vstack([self._shocks[i] for i in idx])
+        pnl = R @ W.T
+        var = np.zeros_like(pnl)
+        scenarios = [self.scenarios[i] for i in idx]
+
+        param = np.array([k for k, s in enumerate(scenarios) if s["kind"] in ("factor", "spike")], dtype=int)
+        if len(param):
+            base_var = np.einsum("pn,pn->p", W @ self._Sigma, W)
+            sw2 = (W @ self._sigma) ** 2
+            scale = np.array([scenarios[k]["scale"] for k in param])
+            rank_one = np.array([scenarios[k]["rank_one"] for k in param])
+            var[param] = scale[:, None] * base_var[None, :] + rank_one[:, None] * sw2[None, :]
+
+        hist = np.array([k for k, s in enumerate(scenarios) if s["kind"] == "historical"], dtype=int)
+        if len(hist):
+            Y = self._X @ W.T
+            Y = Y - Y.mean(axis=0)  # shift-invariant; keeps the window differences well conditioned
+            c1 = np.vstack([np.zeros(W.shape[0]), np.cumsum(Y, axis=0)])
+            c2 = np.vstack([np.zeros(W.shape[0]), np.cumsum(Y * Y, axis=0)])
+            rows = np.array([scenarios[k]["rows"] for k in hist])
+            start, end = rows[:, 0], rows[:, 1]
+            n = (end - start)[:, None]
+            s1 = c1[end] - c1[start]
+            var[hist] = (c2[end] - c2[start] - s1 * s1 / n) / (n - 1) * self.periods_per_year
+
+        for k, s in enumerate(scenarios):
+            if s["kind"] == "override":
+                var[k] = np.einsum("pn,pn->p", W @ s["covariance"], W)
+
+        return pnl, np.sqrt(np.clip(var, 0.0, None))
+
+    def evaluate(self, weights, scenarios: Optional[List[str]] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        weights: Series (one portfolio) or DataFrame [portfolio x symbol]; missing symbols count as 0
+        scenarios: scenario keys to evaluate (all registered scenarios if None)
+        returns: (pnl, annualized volatility), both DataFrames [scenario name x portfolio]
+        """
+        if isinstance(weights, pd.Series):
+            weights = weights.to_frame(weights.name if weights.name is not None else "portfolio").T
+        W = np.ascontiguousarray(weights.reindex(columns=self.symbols).fillna(0.0).values, dtype=float)
+        idx = (np.arange(len(self.scenarios)) if scenarios is None
+               else np.array([self._index[key] for key in scenarios], dtype=int))
+        S, P = len(self.scenarios), W.shape[0]
+
+        # Pull cached rows; anything missing is computed in one block below
+        keys = [self._fingerprint(row) for row in W]
+        pnl_rows, vol_rows, missing = [], [], np.zeros((P, S), dtype=bool)
+        with self._cache_lock:
+            entries = [self._cache.get(key) for key in keys]
+            for key, entry in zip(keys, entries):
+                if entry is not None:
+                    self._cache.move_to_end(key)
+        for p, entry in enumerate(entries):
+            if entry is None:
+                pnl_row, vol_row = np.full(S, np.nan), np.full(S, np.nan)
+            else:
+                # Copies: the rows are filled in below while other threads may read the cached ones
+                pnl_row, vol_row = entry[0].copy(), entry[1].copy()
+                if len(pnl_row) < S:  # scenarios were added since this row was cached
+                    pad = np.full(S - len(pnl_row), np.nan)
+                    pnl_row, vol_row = np.concatenate([pnl_row, pad]), np.concatenate([vol_row, pad])
+            pnl_rows.append(pnl_row)
+            vol_rows.append(vol_row)
+            missing[p] = np.isnan(vol_row)
+
+        need = missing[:, idx]
+        todo_p = np.flatnonzero(need.any(axis=1))
+        if len(todo_p):
+            todo_s = idx[need[todo_p].any(axis=0)]
+            pnl, vol = self._compute(W[todo_p], todo_s)
+            for col, p in enumerate(todo_p):
+                pnl_rows[p][todo_s] = pnl[:, col]
+                vol_rows[p][todo_s] = vol[:, col]
+
+        with self._cache_lock:
+            for key, pnl_row, vol_row in zip(keys, pnl_rows, vol_rows):
+                self._cache[key] = (pnl_row, vol_row)
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        names = [self.scenarios[i]["name"] for i in idx]
+        pnl_df = pd.DataFrame(np.array(pnl_rows)[:, idx].T, index=names, columns=weights.index)
+        vol_df = pd.DataFrame(np.array(vol_rows)[:, idx].T, index=names, columns=weights.index)
+        return pnl_df, vol_df
@@ -10,13 +10,14 @@ class AnalyzerInterface(ABC):
     """
 
     @abstractmethod
-    def analyze(self, price_data: pd.DataFrame, weights: pd.Series) -> dict:
+    def analyze(self, price_data: pd.DataFrame, weights: pd.Series, periods_per_year: int = 252) -> dict:
         """
         Analyze the portfolio given asset prices and weights.
 
         Args:
             price_data (pd.DataFrame): Historical price data with columns as asset names.
             weights (pd.Series): Portfolio weights for each asset.
+            periods_per_year (int): Price observations per year, used to annualize (252 daily, 52 weekly).
 
         Returns:
             dict: Dictionary containing metrics like returns, volatility, and Sharpe ratio.
@@ -0,0 +1,157 @@
+# portfolio_analyzer/attribution_calculator.py
+
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+
+class AttributionCalculator:
+    """
+    Risk attribution over a daily returns matrix: risk contributions, betas
+    against a benchmark, rolling correlations and the diversification ratio.
+
+    Everything is computed with matrix products over the whole returns matrix.
+    Rolling statistics come from differences of running (cumulative) sums
+    instead of a cov() call per window.
+    """
+
+    def calculate_risk_contributions(self, daily_returns: pd.DataFrame, weights: pd.Series,
+                                     periods_per_year: int = TRADING_DAYS) -> pd.DataFrame:
+        """
+        Annualized marginal and total risk contribution per asset.
+        contribution_i = w_i (Σw)_i / σ_p sums to σ_p; pct_contribution sums to 1.
+        """
+        weights = weights.reindex(daily_returns.columns).fillna(0.0)
+        w = weights.values
+        cov = np.atleast_2d(np.cov(daily_returns.values, rowvar=False)) * periods_per_year
+        sigma_w = np.atleast_1d(cov @ w)
+        vol = float(np.sqrt(max(w @ sigma_w, 0.0)))
+        marginal = sigma_w / vol if vol > 0 else np.zeros_like(w)
+        contribution = w * marginal
+        return pd.DataFrame({
+            "weight": w,
+            "marginal_risk": marginal,
+            "risk_contribution": contribution,
+            "pct_risk_contribution": contribution / vol if vol > 0 else np.zeros_like(w),
+        }, index=daily_returns.columns)
+
+    def calculate_betas(self, daily_returns: pd.DataFrame, benchmark_returns: pd.Series) -> pd.Series:
+        """
+        Beta of every asset against the benchmark over their common dates.
+        """
+        benchmark = benchmark_returns.reindex(daily_returns.index)
+        mask = benchmark.notna().values
+        R = daily_returns.values[mask]
+        b = benchmark.values[mask]
+        R = R - R.mean(axis=0)
+        b = b - b.mean()
+        var_b = b @ b
+        betas = R.T @ b / var_b if var_b > 0 else np.full(R.shape[1], np.nan)
+        return pd.Series(betas, index=daily_returns.columns, name="beta")
+
+    def calculate_diversification_ratio(self, daily_returns: pd.DataFrame, weights: pd.Series) -> float:
+        """
+        Weighted average asset volatility over portfolio volatility (1 = no diversification).
+        """
+        w = weights.reindex(daily_returns.columns).fillna(0.0).values
+        cov = np.atleast_2d(np.cov(daily_returns.values, rowvar=False))
+        vol = np.sqrt(max(w @ cov @ w, 0.0))
+        return float(w @ np.sqrt(np.diag(cov)) / vol) if vol > 0 else 1.0
+
+    def _rolling_correlations(self, daily_returns: pd.DataFrame, window: int,
+                              step: int) -> Iterator[Tuple[pd.Timestamp, np.ndarray]]:
+        """
+        Yields (window end date, N x N correlation) every `step` days.
+
+        Running sums S = Σr and P = Σrrᵀ are advanced one block at a time
+        with a single matmul; a window's moments are P(end) − P(start).
+        Returns are demeaned over the full sample first, which leaves the
+        correlations unchanged but keeps the differences well conditioned.
+        """
+        X = daily_returns.values - daily_returns.values.mean(axis=0)
+        T, N = X.shape
+        ends = list(range(window, T + 1, step))
+        starts = {end - window for end in ends}
+
+        S, P = np.zeros(N), np.zeros((N, N))
+        saved: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        points = sorted(starts.union(ends))
+        position = 0
+        for point in points:
+            if point > position:
+                block = X[position:point]
+                S = S + block.sum(axis=0)
+                P = P + block.T @ block
+                position = point
+            if point in starts:
+                saved[point] = (S, P)
+            if point in ends:
+                S0, P0 = saved.pop(point - window)
+                s = S - S0
+                cov = (P - P0 - np.outer(s, s) / window) / (window - 1)
+                std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    corr = cov / np.outer(std, std)
+                yield daily_returns.index[point - 1], np.clip(corr, -1.0, 1.0)
+
+    def calculate_rolling_correlation(self, daily_returns: pd.DataFrame, window: int = 63,
+                                      step: int = 21) -> pd.DataFrame:
+        """
+        Rolling correlation matrices sampled every `step` days, stacked like
+        DataFrame.rolling(window).corr(): MultiIndex (date, asset) x asset.
+        """
+        dates, mats = [], []
+        for date, corr in self._rolling_correlations(daily_returns, window, step):
+            dates.append(date)
+            mats.append(corr)
+        columns = daily_returns.columns
+        index = pd.MultiIndex.from_product([dates, columns], names=["date", "asset"])
+        data = np.concatenate(mats) if mats else np.empty((0, len(columns)))
+        return pd.DataFrame(data, index=index, columns=columns)
+
+    def calculate_average_correlation(self, daily_returns: pd.DataFrame, window: int = 63,
+                                      step: int = 1) -> pd.Series:
+        """
+        Mean pairwise rolling correlation without forming the N x N matrices:
+        with z = 1/σ per window, Σ_ij corr_ij = var(X z), so each window costs
+        one (window x N) product; σ comes from cumulative sums of r and r².
+        """
+        X = daily_returns.values - daily_returns.values.mean(axis=0)
+        T, N = X.shape
+        ends = np.arange(window, T + 1, step)
+        c1 = np.vstack([np.zeros(N), np.cumsum(X, axis=0)])
+        c2 = np.vstack([np.zeros(N), np.cumsum(X * X, axis=0)])
+        s1 = c1[ends] - c1[ends - window]
+        var = (c2[ends] - c2[ends - window] - s1 * s1 / window) / (window - 1)
+        std = np.sqrt(np.clip(var, 0.0, None))
+        with np.errstate(divide="ignore"):
+            Z = np.where(std > 0, 1.0 / std, 0.0)
+
+        totals = np.empty(len(ends))
+        for k, end in enumerate(ends):
+            y = X[end - window:end] @ Z[k]
+            totals[k] = (y @ y - y.sum() ** 2 / window) / (window - 1) - np.count_nonzero(Z[k])
+        values = totals / max(N * (N - 1), 1)
+        return pd.Series(values, index=daily_returns.index[ends - 1], name="average_correlation")
+
+    def attribution_report(self, daily_returns: pd.DataFrame, weights: pd.Series,
+                           benchmark_returns: Optional[pd.Series] = None, window: int = 63,
+                           periods_per_year: int = TRADING_DAYS) -> Dict:
+        """
+        Bundle of the attribution statistics for one portfolio.
+        """
+        table = self.calculate_risk_contributions(daily_returns, weights, periods_per_year)
+        report = {
+            "risk_contributions": table,
+            "diversification_ratio": self.calculate_diversification_ratio(daily_returns, weights),
+            "average_correlation": self.calculate_average_correlation(daily_returns, window),
+        }
+        if benchmark_returns is not None:
+            betas = self.calculate_betas(daily_returns, benchmark_returns)
+            table["beta"] = betas
+            report["betas"] = betas
+            report["portfolio_beta"] = float(table["weight"] @ betas)
+        return report
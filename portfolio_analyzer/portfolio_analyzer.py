@@ -5,6 +5,7 @@ import pandas as pd
 from portfolio_analyzer.analyzer_interface import AnalyzerInterface
 from portfolio_analyzer.return_calculator import ReturnCalculator
 from portfolio_analyzer.volatility_calculator import VolatilityCalculator
+from portfolio_analyzer.attribution_calculator import AttributionCalculator
 
 class PortfolioAnalyzer(AnalyzerInterface):
     """
@@ -16,10 +17,12 @@ class PortfolioAnalyzer(AnalyzerInterface):
         self.risk_free_rate = risk_free_rate
         self.return_calculator = ReturnCalculator()
         self.volatility_calculator = VolatilityCalculator()
+        self.attribution_calculator = AttributionCalculator()
 
-    def analyze(self, price_data: pd.DataFrame, weights: pd.Series) -> dict:
+    def analyze(self, price_data: pd.DataFrame, weights: pd.Series, periods_per_year: int = 252) -> dict:
         """
         Perform complete portfolio analysis.
+        periods_per_year: price observations per year (252 daily, 52 weekly)
         """
 
         # Step 1: Calculate daily returns
@@ -35,22 +38,43 @@ class PortfolioAnalyzer(AnalyzerInterface):
         portfolio_volatility = self.volatility_calculator.calculate_portfolio_volatility(daily_returns, weights)
 
         # Step 5: Calculate Sharpe ratio (annualized)
-        sharpe_ratio = self._calculate_sharpe_ratio(portfolio_returns, portfolio_volatility)
+        sharpe_ratio = self._calculate_sharpe_ratio(portfolio_returns, portfolio_volatility, periods_per_year)
 
         # Step 6: Bundle results
         analysis_results = {
             "Cumulative Return": round(cumulative_return * 100, 2),
-            "Portfolio Volatility": round(portfolio_volatility * np.sqrt(252) * 100, 2),
+            "Portfolio Volatility": round(portfolio_volatility * np.sqrt(periods_per_year) * 100, 2),
             "Sharpe Ratio": round(sharpe_ratio, 3)
         }
 
         return analysis_results
 
-    def _calculate_sharpe_ratio(self, portfolio_returns: pd.Series, portfolio_volatility: float) -> float:
+    def attribution(self, price_data: pd.DataFrame, weights: pd.Series,
+                    benchmark_prices: pd.Series = None, window: int = 63, max_fill_days: int = 5,
+                    periods_per_year: int = 252) -> dict:
+        """
+        Risk contributions, diversification ratio, rolling average correlation
+        and (with a benchmark) betas.
+        benchmark_prices: placed on price_data's dates (last print at most max_fill_days old)
+                          before taking returns, so both cover the same periods
+        """
+        daily_returns = self.return_calculator.calculate_daily_returns(price_data)
+        benchmark_returns = None
+        if benchmark_prices is not None:
+            benchmark_prices = benchmark_prices.sort_index()
+            benchmark_prices = benchmark_prices[~benchmark_prices.index.duplicated(keep="last")]
+            aligned = benchmark_prices.reindex(price_data.index, method="ffill",
+                                               tolerance=pd.Timedelta(days=max_fill_days))
+            benchmark_returns = aligned.pct_change(fill_method=None).dropna()
+        return self.attribution_calculator.attribution_report(daily_returns, weights, benchmark_returns, window,
+                                                              periods_per_year)
+
+    def _calculate_sharpe_ratio(self, portfolio_returns: pd.Series, portfolio_volatility: float,
+                                periods_per_year: int = 252) -> float:
         """
         Compute the annualized Sharpe Ratio.
         """
         mean_daily_return = portfolio_returns.mean()
-        excess_return = mean_daily_return * 252 - self.risk_free_rate
-        annualized_volatility = portfolio_volatility * np.sqrt(252)
+        excess_return = mean_daily_return * periods_per_year - self.risk_free_rate
+        annualized_volatility = portfolio_volatility * np.sqrt(periods_per_year)
         return excess_return / annualized_volatility if annualized_volatility != 0 else 0.0
@@ -16,8 +16,8 @@ class VolatilityCalculator:
         portfolio_volatility = np.sqrt(weights.T @ cov_matrix @ weights)
         return portfolio_volatility
 
-    def calculate_asset_volatility(self, daily_returns: pd.DataFrame) -> pd.Series:
+    def calculate_asset_volatility(self, daily_returns: pd.DataFrame, periods_per_year: int = 252) -> pd.Series:
         """
         Compute annualized volatility for each asset.
         """
-        return daily_returns.std() * np.sqrt(252)
+        return daily_returns.std() * np.sqrt(periods_per_year)
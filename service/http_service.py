@@ -0,0 +1,276 @@
+# service/http_service.py
+
+"""
+Small asyncio HTTP API in front of PortfolioManager.
+
+Endpoints (POST, JSON body):
+    /optimize  {specs, start_date, end_date, method?, risk_free_rate?, target_return?}
+    /analyze   {specs, start_date, end_date, weights, risk_free_rate?}
+    /frontier  {specs, start_date, end_date, n_points?, risk_free_rate?}
+
+Identical in-flight requests are coalesced onto one job, completed results
+are kept in an LRU cache keyed by (endpoint, specs, dates, method, rf, ...),
+and the CPU-bound fetch/solve pipeline runs in a process pool so the event
+loop never blocks.
+
+Run with:  python -m service.http_service --port 8080 [--replay-dir DIR]
+"""
+
+import argparse
+import asyncio
+import json
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from http import HTTPStatus
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from assests.asset_factory import ASSET_TYPES
+from optimizer.execution import SolverChainFailed
+
+ENDPOINTS = ("/optimize", "/analyze", "/frontier")
+MAX_BODY_BYTES = 1 << 20
+
+
+def _build_manager(data_factory, risk_free_rate: float):
+    from assests.asset_factory import AssetFactory
+    from optimizer.optimizer_factory import OptimizerFactory
+    from portfolio.manager import PortfolioManager
+    from portfolio_analyzer.portfolio_analyzer import PortfolioAnalyzer
+
+    return PortfolioManager(
+        asset_factory=AssetFactory,
+        data_factory=data_factory,
+        optimizer_factory=OptimizerFactory,
+        analyzer=PortfolioAnalyzer(risk_free_rate=risk_free_rate),
+    )
+
+
+def _to_builtin(value):
+    if isinstance(value, dict):
+        return {str(k): _to_builtin(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def run_job(endpoint: str, payload: Dict, data_factory) -> Dict:
+    """
+    Execute one request end to end. Runs inside a worker process, so it only
+    takes picklable arguments and returns plain JSON-serializable data.
+    """
+    manager = _build_manager(data_factory, float(payload.get("risk_free_rate", 0.02)))
+    collection = manager.build_collection_from_specs(payload["specs"])
+    price_df = manager.fetch_prices(collection, payload["start_date"], payload["end_date"])
+
+    if endpoint == "/analyze":
+        weights = pd.Series(payload["weights"], dtype=float).reindex(price_df.columns).fillna(0.0)
+        return {"analysis": _to_builtin(manager.analyze_portfolio(price_df, weights))}
+
+    expected_returns, covariance, _ = manager.compute_expected_returns_covariance(price_df)
+
+    if endpoint == "/frontier":
+        frontier = manager.efficient_frontier(expected_returns, covariance, int(payload.get("n_points", 20)))
+        return {"frontier": _to_builtin(frontier.to_dict(orient="records"))}
+
+    weights = manager.optimize(
+        expected_returns, covariance,
+        method=payload.get("method", "mean_variance"),
+        target_return=payload.get("target_return"),
+    )
+    return {
+        "weights": _to_builtin(weights.to_dict()),
+        "expected_returns": _to_builtin(expected_returns.to_dict()),
+        "analysis": _to_builtin(manager.analyze_portfolio(price_df, weights)),
+    }
+
+
+def _validate(endpoint: str, payload: Dict):
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object")
+    for field in ("specs", "start_date", "end_date"):
+        if field not in payload:
+            raise ValueError(f"Missing field: {field}")
+    if not isinstance(payload["specs"], list) or not payload["specs"]:
+        raise ValueError("specs must be a non-empty list")
+    for spec in payload["specs"]:
+        if not isinstance(spec, dict) or not isinstance(spec.get("symbol"), str) or not spec["symbol"].strip():
+            raise ValueError("every spec must be an object with a non-empty symbol")
+        asset_type = spec.get("asset_type") or spec.get("type") or spec.get("asset")
+        if not isinstance(asset_type, str) or asset_type.lower() not in ASSET_TYPES:
+            raise ValueError(f"Unknown asset type for {spec['symbol']}: {asset_type!r} "
+                             f"(expected one of {', '.join(ASSET_TYPES)})")
+    if endpoint == "/analyze" and not isinstance(payload.get("weights"), dict):
+        raise ValueError("weights must be an object mapping symbol to weight")
+
+
+def request_key(endpoint: str, payload: Dict) -> str:
+    """
+    Canonical cache/coalescing key. Spec order does not matter; every other
+    field (dates, method, rf, target_return, weights, n_points) does.
+    """
+    specs = sorted(json.dumps(s, sort_keys=True) for s in payload["specs"])
+    rest = {k: v for k, v in payload.items() if k != "specs"}
+    rest.setdefault("method", "mean_variance")
+    rest.setdefault("risk_free_rate", 0.02)
+    return json.dumps([endpoint, specs, rest], sort_keys=True)
+
+
+class OptimizationService:
+    """
+    Request coalescing + LRU result cache + process-pool execution.
+    """
+
+    def __init__(self, data_factory=None, executor: Optional[Executor] = None,
+                 cache_size: int = 256, max_workers: Optional[int] = None):
+        """
+        data_factory: class/instance providing get_fetcher_for_asset_type(...);
+                      must be picklable when a process pool is used
+        executor: pool for CPU-bound jobs (defaults to a ProcessPoolExecutor)
+        """
+        if data_factory is None:
+            from data_fetcher.data_factory import DataFetcherFactory
+            data_factory = DataFetcherFactory
+        self.data_factory = data_factory
+        self.executor = executor or ProcessPoolExecutor(max_workers=max_workers)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "jobs": 0}
+
+    async def handle(self, endpoint: str, payload: Dict) -> Dict:
+        """
+        Resolve one request, hitting the cache or joining an in-flight job where possible.
+        Raises ValueError for bad requests.
+        """
+        if endpoint not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint: {endpoint}")
+        _validate(endpoint, payload)
+        self.stats["requests"] += 1
+
+        key = request_key(endpoint, payload)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return self._cache[key]
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, run_job, endpoint, payload, self.data_factory)
+            self._inflight[key] = future
+            self.stats["jobs"] += 1
+            future.add_done_callback(lambda f, k=key: self._on_done(k, f))
+
+        # shield: a client disconnect must not cancel the job other waiters share
+        return await asyncio.shield(future)
+
+    def _on_done(self, key: str, future: asyncio.Future):
+        self._inflight.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._cache[key] = future.result()
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: HTTPStatus, body: Dict):
+        data = json.dumps(body).encode()
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(head.encode() + data)
+        await writer.drain()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            status, body = await self._dispatch(reader)
+            await self._respond(writer, status, body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, reader: asyncio.StreamReader) -> Tuple[HTTPStatus, Dict]:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        parts = request_line.split()
+        if len(parts) != 3:
+            return HTTPStatus.BAD_REQUEST, {"error": "Malformed request line"}
+        method, path, _ = parts
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1")
+            if line in ("\r\n", "\n", ""):
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if method == "GET" and path == "/health":
+            return HTTPStatus.OK, {"status": "ok", **self.stats}
+        if path not in ENDPOINTS:
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint: {path}"}
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use POST"}
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"}
+        if length < 0:
+            return HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"}
+        if length > MAX_BODY_BYTES:
+            return HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request body too large"}
+        try:
+            payload = json.loads(await reader.readexactly(length) or b"{}")
+            return HTTPStatus.OK, await self.handle(path, payload)
+        except (ValueError, KeyError) as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except SolverChainFailed as e:
+            return HTTPStatus.UNPROCESSABLE_ENTITY, {"error": str(e)}
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"}
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080):
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portfolio optimization HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache-size", type=int, default=256)
+    parser.add_argument("--replay-dir", default=None, help="Serve prices from local CSVs instead of the network")
+    args = parser.parse_args()
+
+    data_factory = None
+    if args.replay_dir:
+        from data_fetcher.replay_fetcher import ReplayDataFactory
+        data_factory = ReplayDataFactory(args.replay_dir)
+
+    service = OptimizationService(data_factory, cache_size=args.cache_size, max_workers=args.workers)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
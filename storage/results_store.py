@@ -0,0 +1,208 @@
+# storage/results_store.py
+
+"""
+Append-only SQLite store for optimization runs.
+
+Every run records its inputs (specs, dates, method, rf), a fingerprint of
+the μ/Σ it was solved on, the resulting weights, portfolio metrics and
+stage timings. Weights live in a long (run_id, symbol) table indexed by
+symbol, and headline metrics are real columns with their own indexes, so
+history queries ("weights of X over time", "runs with Sharpe > s") are
+index lookups instead of re-running optimizations.
+"""
+
+import hashlib
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at        TEXT NOT NULL,
+    start_date        TEXT,
+    end_date          TEXT,
+    method            TEXT,
+    solver            TEXT,
+    risk_free_rate    REAL,
+    target_return     REAL,
+    n_assets          INTEGER,
+    fingerprint       TEXT,
+    -- returns and volatility are decimals (0.12 = 12%), annualized where applicable
+    expected_return   REAL,
+    volatility        REAL,
+    sharpe_ratio      REAL,
+    cumulative_return REAL,
+    specs_json        TEXT,
+    metrics_json      TEXT,
+    timings_json      TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs (created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_sharpe ON runs (sharpe_ratio);
+CREATE INDEX IF NOT EXISTS idx_runs_fingerprint ON runs (fingerprint);
+CREATE INDEX IF NOT EXISTS idx_runs_method ON runs (method, created_at);
+
+CREATE TABLE IF NOT EXISTS weights (
+    run_id          INTEGER NOT NULL REFERENCES runs (run_id),
+    symbol          TEXT NOT NULL,
+    weight          REAL NOT NULL,
+    expected_return REAL,
+    PRIMARY KEY (run_id, symbol)
+);
+CREATE INDEX IF NOT EXISTS idx_weights_symbol ON weights (symbol, run_id);
+"""
+
+# runs column -> (metric name, scale to decimal) in lookup order. PortfolioAnalyzer
+# reports its display metrics ("Portfolio Volatility", ...) in percent.
+_METRIC_COLUMNS = {
+    "sharpe_ratio": (("Sharpe Ratio", 1.0), ("sharpe_ratio", 1.0)),
+    "volatility": (("Portfolio Volatility", 0.01), ("volatility", 1.0)),
+    "cumulative_return": (("Cumulative Return", 0.01), ("cumulative_return", 1.0)),
+    "expected_return": (("Expected Return", 0.01), ("expected_return", 1.0)),
+}
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def risk_model_fingerprint(expected_returns: pd.Series, covariance: pd.DataFrame) -> str:
+    """Stable hash of the symbols and μ/Σ values a run was solved on."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update("\x1f".join(map(str, expected_returns.index)).encode())
+    h.update(np.ascontiguousarray(expected_returns.values, dtype=float).tobytes())
+    h.update(np.ascontiguousarray(covariance.values, dtype=float).tobytes())
+    return h.hexdigest()
+
+
+class ResultsStore:
+    """
+    Append-only local results store (SQLite, one file).
+    """
+
+    def __init__(self, path: str = "results.db"):
+        self.path = path
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:  # commit on success, roll back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def record_run(self, specs: List[Dict], start_date: str, end_date: str, method: str,
+                   weights: pd.Series, expected_returns: pd.Series, covariance: pd.DataFrame,
+                   metrics: Optional[Dict] = None, timings: Optional[Dict] = None,
+                   risk_free_rate: Optional[float] = None, target_return: Optional[float] = None,
+                   solver: Optional[str] = None) -> int:
+        """
+        Append one run and its weights. Returns the new run_id.
+        metrics: analyzer output, stored verbatim in metrics_json; the headline columns
+                 are normalized to decimals
+        """
+        metrics = metrics or {}
+        columns = {col: next((float(metrics[k]) * scale for k, scale in keys
+                              if metrics.get(k) is not None), None)
+                   for col, keys in _METRIC_COLUMNS.items()}
+        if columns["expected_return"] is None:
+            w = weights.reindex(expected_returns.index).fillna(0.0)
+            columns["expected_return"] = float(w @ expected_returns)
+
+        row = {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="microseconds"),
+            "start_date": str(start_date),
+            "end_date": str(end_date),
+            "method": method,
+            "solver": solver,
+            "risk_free_rate": risk_free_rate,
+            "target_return": target_return,
+            "n_assets": int(len(weights)),
+            "fingerprint": risk_model_fingerprint(expected_returns, covariance),
+            **{k: None if v is None else float(v) for k, v in columns.items()},
+            "specs_json": json.dumps(specs, default=_json_default),
+            "metrics_json": json.dumps(metrics, default=_json_default),
+            "timings_json": json.dumps(timings or {}, default=_json_default),
+        }
+        with self._connect() as conn:
+            cur = conn.execute(
+                f"INSERT INTO runs ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                list(row.values()),
+            )
+            run_id = cur.lastrowid
+            mu = expected_returns.reindex(weights.index)
+            conn.executemany(
+                "INSERT INTO weights (run_id, symbol, weight, expected_return) VALUES (?, ?, ?, ?)",
+                [(run_id, str(s), float(w), None if pd.isna(m) else float(m))
+                 for s, w, m in zip(weights.index, weights.values, mu.values)],
+            )
+        return run_id
+
+    def weights_for_symbol(self, symbol: str) -> pd.DataFrame:
+        """All recorded weights for one symbol, oldest first."""
+        with self._connect() as conn:
+            return pd.read_sql_query(
+                "SELECT r.run_id, r.created_at, r.method, w.weight, w.expected_return "
+                "FROM weights w JOIN runs r ON r.run_id = w.run_id "
+                "WHERE w.symbol = ? ORDER BY r.created_at",
+                conn, params=(symbol,), parse_dates=["created_at"],
+            )
+
+    def weights_for_run(self, run_id: int) -> pd.Series:
+        with self._connect() as conn:
+            df = pd.read_sql_query("SELECT symbol, weight FROM weights WHERE run_id = ?", conn, params=(run_id,))
+        return df.set_index("symbol")["weight"].rename(run_id)
+
+    def runs(self, min_sharpe: Optional[float] = None, method: Optional[str] = None,
+             since: Optional[str] = None, fingerprint: Optional[str] = None,
+             limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Query run headlines (no JSON blobs). All filters are optional and indexed.
+        """
+        clauses, params = [], []
+        if min_sharpe is not None:
+            clauses.append("sharpe_ratio > ?")
+            params.append(min_sharpe)
+        if method is not None:
+            clauses.append("method = ?")
+            params.append(method)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(pd.Timestamp(since, tz="UTC").isoformat())
+        if fingerprint is not None:
+            clauses.append("fingerprint = ?")
+            params.append(fingerprint)
+
+        sql = ("SELECT run_id, created_at, start_date, end_date, method, solver, risk_free_rate, "
+               "target_return, n_assets, fingerprint, expected_return, volatility, sharpe_ratio, "
+               "cumulative_return FROM runs")
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._connect() as conn:
+            return pd.read_sql_query(sql, conn, params=params, parse_dates=["created_at"])
+
+    def get_run(self, run_id: int) -> Dict:
+        """Full record of one run, JSON fields decoded."""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise KeyError(run_id)
+        record = dict(row)
+        for field in ("specs_json", "metrics_json", "timings_json"):
+            record[field[:-5]] = json.loads(record.pop(field))
+        return record
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio_analyzer.attribution_calculator import AttributionCalculator, TRADING_DAYS
+
+
+def _returns(n_assets: int, n_days: int = 300, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2021-01-01", periods=n_days)
+    return pd.DataFrame(rng.normal(0.0005, 0.01, (n_days, n_assets)), index=index,
+                        columns=[f"A{i}" for i in range(n_assets)])
+
+
+def test_single_asset_risk_contributions():
+    returns = _returns(1)
+    table = AttributionCalculator().calculate_risk_contributions(returns, pd.Series({"A0": 1.0}))
+    vol = returns["A0"].std() * np.sqrt(TRADING_DAYS)
+    assert table.loc["A0", "risk_contribution"] == pytest.approx(vol)
+    assert table.loc["A0", "pct_risk_contribution"] == pytest.approx(1.0)
+
+
+def test_single_asset_report():
+    returns = _returns(1)
+    report = AttributionCalculator().attribution_report(returns, pd.Series({"A0": 1.0}), returns["A0"])
+    assert report["diversification_ratio"] == pytest.approx(1.0)
+    assert report["portfolio_beta"] == pytest.approx(1.0)
+
+
+def test_contributions_sum_to_volatility():
+    returns = _returns(4)
+    weights = pd.Series([0.1, 0.2, 0.3, 0.4], index=returns.columns)
+    table = AttributionCalculator().calculate_risk_contributions(returns, weights)
+    cov = returns.cov().values * TRADING_DAYS
+    vol = np.sqrt(weights.values @ cov @ weights.values)
+    assert table["risk_contribution"].sum() == pytest.approx(vol)
+    assert table["pct_risk_contribution"].sum() == pytest.approx(1.0)
+
+
+def test_benchmark_aligned_to_weekly_prices():
+    from portfolio_analyzer.portfolio_analyzer import PortfolioAnalyzer
+
+    rng = np.random.default_rng(1)
+    days = pd.bdate_range("2019-01-01", periods=750)
+    bench = pd.Series(100 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, len(days)))), index=days, name="BENCH")
+    asset = bench * np.exp(np.cumsum(rng.normal(0.0, 0.001, len(days))))
+    weekly = asset.resample("W-FRI").last().to_frame("A0")
+
+    report = PortfolioAnalyzer().attribution(weekly, pd.Series({"A0": 1.0}), bench, window=10)
+    assert report["portfolio_beta"] == pytest.approx(1.0, abs=0.05)
@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_fetcher.bond_returns import yields_to_total_return_index
+
+
+def _flat(level: float, days: int = 253) -> pd.DataFrame:
+    return pd.DataFrame({"DGS10": np.full(days, level)}, index=pd.bdate_range("2022-01-03", periods=days))
+
+
+@pytest.mark.parametrize("coupon", [None, 1.0, 4.0, 8.0])
+def test_flat_yield_earns_the_yield(coupon):
+    index = yields_to_total_return_index(_flat(4.0), coupon_rates=[coupon])
+    assert index["DGS10"].iloc[-1] == pytest.approx(104.0, abs=0.2)
+
+
+def test_rising_yield_loses_about_duration_times_move():
+    yields = _flat(4.0, days=2)
+    yields.iloc[1] = 5.0
+    index = yields_to_total_return_index(yields)
+    # 10-year par bond at 4%: modified duration about 8.2
+    assert index["DGS10"].iloc[-1] - 100.0 == pytest.approx(-7.8, abs=0.3)
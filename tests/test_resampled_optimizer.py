@@ -0,0 +1,17 @@
+import numpy as np
+import pandas as pd
+
+from optimizer.mean_variance_optimizer import MeanVarianceOptimizer
+from optimizer.resampled_optimizer import ResampledMeanVarianceOptimizer
+
+
+def test_default_objective_matches_mean_variance():
+    rng = np.random.default_rng(0)
+    n = 8
+    returns = pd.DataFrame(rng.normal(4e-4, 0.01, (750, n)) * np.linspace(0.5, 2.0, n),
+                           columns=[f"S{i}" for i in range(n)])
+    mu, cov = returns.mean() * 252, returns.cov() * 252
+
+    expected = MeanVarianceOptimizer("slsqp").optimize(mu, cov)
+    weights = ResampledMeanVarianceOptimizer(returns, n_resamples=50, max_workers=1, seed=0).optimize(mu, cov)
+    assert np.abs(weights - expected).max() < 0.03